@@ -42,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'todo',
     'rest_framework',
     'authentication',
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Pierwszy, żeby Server-Timing "total" obejmował cały stos middleware
+    "users.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -67,9 +70,21 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_HEADERS = [
     "authorization",
     "content-type",
+    "if-none-match",
+    "if-match",
 ]
 CORS_ALLOW_CREDENTIALS = True
 
+# Nagłówki paginacji kursorowej widoczne dla frontendu
+CORS_EXPOSE_HEADERS = [
+    "X-Next-Cursor",
+    "Link",
+    "ETag",
+    "X-Sync-Cursor",
+    "X-Has-More",
+    "Server-Timing",
+]
+
 
 ROOT_URLCONF = 'ToDoProject.urls'
 
@@ -94,6 +109,14 @@ WSGI_APPLICATION = 'ToDoProject.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Połączenia z bazą:
+# - DB_POOL=1 -> pula psycopg3 w każdym procesie (Django "pool"), wymaga CONN_MAX_AGE=0;
+#   zalecane pod ASGI, gdzie trwałe połączenia per wątek się nie sprawdzają
+# - inaczej trwałe połączenia (DB_CONN_MAX_AGE sekund, 0 = nowe na każdy request)
+# CONN_HEALTH_CHECKS sprawdza połączenie przed ponownym użyciem po restarcie bazy.
+
+DB_POOL = os.environ.get("DB_POOL", "0") == "1"
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.postgresql",
@@ -102,9 +125,52 @@ DATABASES = {
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
         "HOST": "db",
         "PORT": "5432",
+        "CONN_MAX_AGE": 0 if DB_POOL else int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "pool": {
+                "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+                "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+                "timeout": int(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            },
+        } if DB_POOL else {},
+    }
+}
+
+# Cache (Redis z docker-compose)
+# IGNORE_EXCEPTIONS: awaria Redisa degraduje do braku cache zamiast 500
+
+REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379/1")
+
+# Limity czasu (sekundy) dla wszystkich klientów Redisa - zawieszony Redis
+# ma dać błąd, a nie zablokować worker
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "2"))
+REDIS_CONNECT_TIMEOUT = float(os.environ.get("REDIS_CONNECT_TIMEOUT", "1"))
+
+CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": REDIS_URL,
+        "OPTIONS": {
+            "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            "IGNORE_EXCEPTIONS": True,
+            "SOCKET_TIMEOUT": REDIS_SOCKET_TIMEOUT,
+            "SOCKET_CONNECT_TIMEOUT": REDIS_CONNECT_TIMEOUT,
+        },
+        "KEY_PREFIX": "justtodo",
     }
 }
 
+# Zdarzenia o zmianach tasków (/api/tasks/events/, SSE):
+# "redis" - pub/sub w Redisie, "memory" - w pamięci procesu (dev / testy)
+
+TASK_EVENTS_BACKEND = os.environ.get("TASK_EVENTS_BACKEND", "redis")
+
+# Token wymagany przez /metrics ("Authorization: Bearer <token>"). Bez tokenu
+# endpoint jest zamknięty, chyba że METRICS_PUBLIC=1 (scraper w sieci wewnętrznej)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_PUBLIC = os.environ.get("METRICS_PUBLIC", "0") == "1"
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -112,6 +178,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'users.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 SIMPLE_JWT = {
@@ -15,5 +15,7 @@ if not User.objects.filter(username='$DJANGO_SUPERUSER_USERNAME').exists():
 END
 
 # Uruchom Gunicorn
+# Workery, wątki, preload i klasę workera (SERVER_MODE / GUNICORN_*)
+# ustawia gunicorn.conf.py
 echo "Uruchamiam Gunicorn..."
-exec gunicorn ToDoProject.wsgi:application --bind 0.0.0.0:8000
+exec gunicorn -c gunicorn.conf.py
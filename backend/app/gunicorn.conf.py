@@ -0,0 +1,87 @@
+"""
+Konfiguracja Gunicorna dla produkcji (ładowana automatycznie z katalogu /app).
+
+Wszystko da się nadpisać zmiennymi środowiskowymi:
+    GUNICORN_WORKER_CLASS   sync | gthread | gevent | uvicorn (domyślnie gthread,
+                            albo uvicorn gdy SERVER_MODE=asgi - wtedy tylko uvicorn)
+    GUNICORN_WORKERS        liczba procesów (domyślnie 2 * CPU + 1, dla uvicorn CPU)
+    GUNICORN_THREADS        wątki na worker dla gthread (domyślnie 4)
+    GUNICORN_PRELOAD        1/0 - ładowanie Django przed forkiem (domyślnie 1)
+    GUNICORN_MAX_REQUESTS   restart workera po N requestach (domyślnie 1000)
+    GUNICORN_TIMEOUT, GUNICORN_KEEPALIVE, GUNICORN_BIND
+
+gevent wymaga doinstalowania pakietu gevent (nie ma go w requirements.txt).
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+WORKER_CLASSES = {
+    "sync": "sync",
+    "gthread": "gthread",
+    "gevent": "gevent",
+    "uvicorn": "uvicorn_worker.UvicornWorker",
+}
+
+_asgi = os.environ.get("SERVER_MODE") == "asgi"
+# Puste GUNICORN_WORKER_CLASS (jak w env.example) = domyślna klasa dla trybu
+_worker_name = os.environ.get("GUNICORN_WORKER_CLASS") or ("uvicorn" if _asgi else "gthread")
+if _worker_name not in WORKER_CLASSES:
+    raise RuntimeError(
+        f"GUNICORN_WORKER_CLASS={_worker_name!r}, expected one of {sorted(WORKER_CLASSES)}"
+    )
+# SSE i widoki async wymagają ASGI - worker WSGI po cichu by je zepsuł
+if _asgi and _worker_name != "uvicorn":
+    raise RuntimeError(
+        f"SERVER_MODE=asgi needs GUNICORN_WORKER_CLASS=uvicorn (or empty), got {_worker_name!r}"
+    )
+
+_cpus = multiprocessing.cpu_count()
+
+# Aplikacja: uvicorn potrzebuje ASGI, reszta WSGI
+wsgi_app = (
+    "ToDoProject.asgi:application" if _worker_name == "uvicorn"
+    else "ToDoProject.wsgi:application"
+)
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = WORKER_CLASSES[_worker_name]
+
+# Workery async (uvicorn/gevent) obsługują wiele połączeń w jednym procesie,
+# więc wystarczy proces na rdzeń; sync/gthread klasycznie 2 * CPU + 1
+workers = _env_int(
+    "GUNICORN_WORKERS",
+    _cpus if _worker_name in ("uvicorn", "gevent") else _cpus * 2 + 1,
+)
+threads = _env_int("GUNICORN_THREADS", 4 if _worker_name == "gthread" else 1)
+worker_connections = _env_int("GUNICORN_WORKER_CONNECTIONS", 1000)
+
+# Django ładowane raz w masterze - workery dzielą pamięć copy-on-write
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+# Recykling workerów (wycieki pamięci), z jitterem żeby nie restartowały się naraz
+max_requests = _env_int("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _env_int("GUNICORN_MAX_REQUESTS_JITTER", max(max_requests // 10, 1))
+
+timeout = _env_int("GUNICORN_TIMEOUT", 30)
+graceful_timeout = _env_int("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("GUNICORN_KEEPALIVE", 5)
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Przy preload_app nic nie powinno być połączone w masterze,
+    # ale na wszelki wypadek nie dzielimy socketów do bazy między procesy
+    if not server.cfg.preload_app:
+        return
+
+    from django.db import connections
+
+    connections.close_all()
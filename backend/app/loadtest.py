@@ -0,0 +1,228 @@
+"""
+Prosty test obciążeniowy API (sama biblioteka standardowa, działa offline
+na lokalnym stacku).
+
+Scenariusze (--scenario):
+    list      GET --path (domyślnie lista tasków)
+    register  POST /api/register/ z unikalnymi userami
+    login     POST /api/login/
+    refresh   POST /api/refresh/
+    crud      create -> update (If-Match) -> list -> delete
+    mixed     login, refresh i crud naraz
+
+Dane testowe: python manage.py seed_tasks --users 100 --tasks 200, potem np.
+
+    python loadtest.py --scenario crud --users 100 --password Seed-Passw0rd!
+
+(--users N loguje się jako seed_000000 ... seed_{N-1}, --username jako jeden user).
+
+Przykład - porównanie klas workerów Gunicorna: ustaw w .env
+GUNICORN_WORKER_CLASS=sync, zrestartuj kontener web i uruchom
+
+    python loadtest.py --base-url http://localhost:8005 --username admin --password paswd
+
+a potem to samo dla gthread / uvicorn i porównaj req/s.
+"""
+import argparse
+import itertools
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(method, url, token=None, body=None, headers=None):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method)
+    req.add_header("Content-Type", "application/json")
+    if token:
+        req.add_header("Authorization", f"Bearer {token}")
+    for name, value in (headers or {}).items():
+        req.add_header(name, value)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            payload = response.read()
+            status = response.status
+            response_headers = response.headers
+    except urllib.error.HTTPError as exc:
+        payload = exc.read()
+        status = exc.code
+        response_headers = exc.headers
+    except OSError:
+        # Zerwane połączenie / timeout - liczony jako błąd ze statusem 0
+        payload = b""
+        status = 0
+        response_headers = {}
+    return status, payload, time.perf_counter() - start, response_headers
+
+
+def login(base_url, username, password, attempts=5):
+    for attempt in range(attempts):
+        status, payload, _, _ = request(
+            "POST", f"{base_url}/api/login/", body={"username": username, "password": password}
+        )
+        # 429 z limitu weryfikacji haseł albo zerwane połączenie - ponawiamy
+        if status not in (0, 429):
+            break
+        time.sleep(0.5 * (attempt + 1))
+
+    if status != 200:
+        raise SystemExit(f"Login failed ({status}): {payload[:200]!r}")
+    return json.loads(payload)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Recorder:
+    """
+    Latencje i błędy per operacja, zbierane z wielu wątków.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def call(self, name, method, url, **kwargs):
+        status, payload, latency, headers = request(method, url, **kwargs)
+        with self.lock:
+            self.latencies[name].append(latency * 1000)
+            if not 200 <= status < 400:
+                self.errors[name] += 1
+        return status, payload, headers
+
+    def report(self, elapsed, concurrency):
+        total = sum(len(values) for values in self.latencies.values())
+        errors = sum(self.errors.values())
+        print(f"requests:    {total} (concurrency {concurrency}, errors {errors}, {elapsed:.1f} s)")
+        print(f"throughput:  {total / elapsed:.1f} req/s")
+        print()
+        print(f"{'operation':<10} {'count':>7} {'errors':>7} {'req/s':>8} {'avg':>8} {'p50':>8} {'p95':>8} {'p99':>8}  (ms)")
+        for name, values in self.latencies.items():
+            print(
+                f"{name:<10} {len(values):>7} {self.errors[name]:>7} {len(values) / elapsed:>8.1f} "
+                f"{statistics.mean(values):>8.1f} {percentile(values, 50):>8.1f} "
+                f"{percentile(values, 95):>8.1f} {percentile(values, 99):>8.1f}"
+            )
+
+
+class Scenarios:
+    """
+    Jedna iteracja każdego scenariusza. Sesje (tokeny) są per wątek,
+    logowane leniwie na kolejnych userach z listy.
+    """
+
+    def __init__(self, args, recorder):
+        self.base_url = args.base_url
+        self.path = args.path
+        self.password = args.password
+        self.recorder = recorder
+        self.local = threading.local()
+
+        if args.username:
+            self.usernames = itertools.cycle([args.username])
+        else:
+            self.usernames = itertools.cycle(f"{args.user_prefix}{number:06d}" for number in range(args.users))
+        self.usernames_lock = threading.Lock()
+
+    def next_username(self):
+        with self.usernames_lock:
+            return next(self.usernames)
+
+    def session(self):
+        if not hasattr(self.local, "session"):
+            self.local.session = login(self.base_url, self.next_username(), self.password)
+        return self.local.session
+
+    def list(self):
+        self.recorder.call("list", "GET", f"{self.base_url}{self.path}", token=self.session()["access"]["token"])
+
+    def register(self):
+        username = f"load_{uuid.uuid4().hex[:12]}"
+        self.recorder.call(
+            "register", "POST", f"{self.base_url}/api/register/",
+            body={"username": username, "email": f"{username}@example.com", "password": self.password},
+        )
+
+    def login(self):
+        self.recorder.call(
+            "login", "POST", f"{self.base_url}/api/login/",
+            body={"username": self.next_username(), "password": self.password},
+        )
+
+    def refresh(self):
+        self.recorder.call(
+            "refresh", "POST", f"{self.base_url}/api/refresh/",
+            body={"refresh": self.session()["refresh"]["token"]},
+        )
+
+    def crud(self):
+        token = self.session()["access"]["token"]
+        url = f"{self.base_url}/api/tasks/"
+
+        status, payload, headers = self.recorder.call(
+            "create", "POST", url, token=token,
+            body={"title": "Load test", "description": "x" * 200, "priority": "high"},
+        )
+        if status != 201:
+            return
+        task_id = json.loads(payload)["id"]
+
+        self.recorder.call(
+            "update", "PUT", f"{url}?id={task_id}", token=token,
+            body={"status": "completed"}, headers={"If-Match": headers["ETag"]},
+        )
+        self.recorder.call("list", "GET", f"{url}?limit=50", token=token)
+        self.recorder.call("delete", "DELETE", f"{url}?id={task_id}", token=token)
+
+    def mixed(self):
+        self.login()
+        self.refresh()
+        self.crud()
+
+
+def run(scenario, concurrency, iterations):
+    def one(_):
+        scenario()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(iterations)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8005")
+    parser.add_argument(
+        "--scenario", default="list", choices=["list", "register", "login", "refresh", "crud", "mixed"]
+    )
+    parser.add_argument("--path", default="/api/tasks/", help="Endpoint scenariusza list (GET)")
+    parser.add_argument("--username", help="Jeden user dla wszystkich wątków")
+    parser.add_argument("--users", type=int, default=100, help="Liczba userów z seed_tasks (bez --username)")
+    parser.add_argument("--user-prefix", default="seed_")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="Liczba iteracji scenariusza")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    scenarios = Scenarios(args, recorder)
+
+    elapsed = run(getattr(scenarios, args.scenario), args.concurrency, args.requests)
+    recorder.report(elapsed, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
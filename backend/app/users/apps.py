@@ -2,4 +2,9 @@ from django.apps import AppConfig
 
 
 class UsersConfig(AppConfig):
+    # Migracje (0001, 0002, 0006) tworzą klucze jako BigAutoField
+    default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
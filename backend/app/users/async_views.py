@@ -0,0 +1,237 @@
+import json
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .authentication import StatelessJWTAuthentication
+from .cache import (
+    TASK_LIST_TIMEOUT,
+    abump_task_list_version,
+    aget_task_list_version,
+    etag_matches,
+    task_list_cache_key,
+    task_list_etag,
+)
+from .events import get_broker, publish_task_event
+from .metrics import timed
+from .models import Task
+from .pagination import next_page_headers, split_page
+from .queries import (
+    delete_task,
+    parse_if_match,
+    precondition_failed,
+    project_rows,
+    task_etag,
+    task_list_queryset,
+    task_list_values,
+    update_task,
+)
+from .serializers import TaskSerializer
+
+
+class AsyncAuthenticatedView(View):
+    """
+    Baza widoków async: JWT z claimów (bez zapytania o User)
+    i brak CSRF, tak jak w APIView z DRF.
+    """
+
+    authentication = StatelessJWTAuthentication()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Tak jak APIView z DRF - autoryzacja jest przez JWT, nie przez cookie
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            request.user = await self.authentication.aauthenticate(request)
+        except TokenError as exc:
+            return self.unauthorized(request, InvalidToken(exc.args[0]))
+        except (AuthenticationFailed, InvalidToken) as exc:
+            return self.unauthorized(request, exc)
+
+        if request.user is None:
+            return self.unauthorized(request, NotAuthenticated())
+
+        return await super().dispatch(request, *args, **kwargs)
+
+    def unauthorized(self, request, exc):
+        # Ten sam kształt co exception_handler DRF w widokach sync:
+        # detail jako słownik (InvalidToken) albo {"detail": ...}
+        data = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+        return JsonResponse(
+            data,
+            status=401,
+            headers={"WWW-Authenticate": self.authentication.authenticate_header(request)},
+        )
+
+
+class AsyncTaskView(AsyncAuthenticatedView):
+    """
+    Odpowiednik TaskView dla ASGI (uvicorn): async ORM i async API cache,
+    więc jeden proces obsługuje tysiące równoległych połączeń
+    (long-polling) bez blokowania wątku na każde z nich.
+    Walidacja idzie przez ten sam TaskSerializer co w wersji sync.
+    """
+
+    # =========================
+    # GET - lista + filtrowanie
+    # =========================
+    async def get(self, request):
+        params = request.GET
+        version = await aget_task_list_version(request.user.id)
+        etag = task_list_etag(request.user.id, version, params)
+
+        if etag_matches(request, etag):
+            response = HttpResponse(status=304)
+        else:
+            cache_key = task_list_cache_key(request.user.id, version, params)
+            cached = await cache.aget(cache_key)
+
+            if cached is None:
+                try:
+                    tasks, fields, limit = task_list_queryset(request.user.id, params)
+                except ValueError as exc:
+                    return JsonResponse({"error": str(exc)}, status=400)
+
+                rows, columns = task_list_values(tasks, fields)
+                page, next_cursor = split_page([row async for row in rows], limit)
+                cached = (project_rows(page, columns), next_page_headers(request, next_cursor))
+                await cache.aset(cache_key, cached, TASK_LIST_TIMEOUT)
+
+            data, headers = cached
+            with timed("render"):
+                body = orjson.dumps(data)
+            response = HttpResponse(body, content_type="application/json", headers=headers)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    # =========================
+    # POST - dodanie
+    # =========================
+    async def post(self, request):
+        try:
+            body = self.parse_body(request)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+        serializer = TaskSerializer(data=body)
+
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        task = await Task.objects.acreate(user_id=request.user.id, **serializer.validated_data)
+        await abump_task_list_version(request.user.id)
+
+        data = TaskSerializer(task).data
+        await sync_to_async(publish_task_event)(request.user.id, "created", task=data)
+        return JsonResponse(data, status=201, headers={"ETag": task_etag(task)})
+
+    # =========================
+    # PUT - edycja / toggle
+    # =========================
+    async def put(self, request):
+        task_id = request.GET.get("id")
+
+        if not task_id:
+            return JsonResponse({"error": "Task id required"}, status=400)
+
+        try:
+            task_id = int(task_id)
+            expected_version = parse_if_match(request, task_id)
+        except ValueError:
+            return JsonResponse({"error": "Invalid task id or If-Match"}, status=400)
+
+        try:
+            body = self.parse_body(request)
+        except ValueError:
+            return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+        serializer = TaskSerializer(data=body, partial=True)
+
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        # UPDATE ... RETURNING to surowy SQL - ORM async nie ma odpowiednika
+        task = await sync_to_async(update_task)(
+            task_id, request.user.id, serializer.validated_data, expected_version
+        )
+
+        if task is None:
+            if await sync_to_async(precondition_failed)(task_id, request.user.id, expected_version):
+                return JsonResponse({"error": "Task was modified"}, status=412)
+            return JsonResponse({"error": "Task not found"}, status=404)
+
+        await abump_task_list_version(request.user.id)
+
+        data = TaskSerializer(task).data
+        await sync_to_async(publish_task_event)(request.user.id, "updated", task=data)
+        return JsonResponse(data, headers={"ETag": task_etag(task)})
+
+    # =========================
+    # DELETE - usuwanie
+    # =========================
+    async def delete(self, request):
+        task_id = request.GET.get("id")
+
+        if not task_id:
+            return JsonResponse({"error": "Task id required"}, status=400)
+
+        try:
+            task_id = int(task_id)
+            expected_version = parse_if_match(request, task_id)
+        except ValueError:
+            return JsonResponse({"error": "Invalid task id or If-Match"}, status=400)
+
+        deleted = await sync_to_async(delete_task)(task_id, request.user.id, expected_version)
+        if not deleted:
+            if await sync_to_async(precondition_failed)(task_id, request.user.id, expected_version):
+                return JsonResponse({"error": "Task was modified"}, status=412)
+            return JsonResponse({"error": "Task not found"}, status=404)
+
+        await abump_task_list_version(request.user.id)
+        await sync_to_async(publish_task_event)(request.user.id, "deleted", id=task_id)
+        return HttpResponse(status=204)
+
+    @staticmethod
+    def parse_body(request):
+        # Błędny JSON (także złe kodowanie) -> ValueError, widok odpowiada 400
+        # jak parser DRF w widokach sync, zamiast po cichu traktować go jak {}
+        return json.loads(request.body or b"{}")
+
+
+class TaskEventsView(AsyncAuthenticatedView):
+    """
+    Strumień zmian tasków użytkownika (Server-Sent Events) z pub/sub brokera.
+    Wymaga ASGI (SERVER_MODE=asgi) - pod WSGI każde połączenie zajmuje worker.
+    Klient po utracie połączenia dociąga brakujące zmiany przez /tasks/sync/.
+    """
+
+    HEARTBEAT = 15
+
+    async def get(self, request):
+        response = StreamingHttpResponse(
+            self.stream(request.user.id),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"  # nginx nie buforuje strumienia
+        return response
+
+    async def stream(self, user_id):
+        yield "retry: 3000\n\n"
+        async for message in get_broker().listen(user_id, self.HEARTBEAT):
+            if message is None:
+                yield ": ping\n\n"
+            else:
+                yield f"data: {message}\n\n"
@@ -0,0 +1,130 @@
+import os
+import threading
+
+from django.contrib.auth import user_login_failed
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+
+from .metrics import timed
+
+# Ile weryfikacji hasła naraz w jednym procesie i jak długo request czeka
+# na wolne miejsce, zanim dostanie 429. Czekanie jest krótkie: wątek, który
+# czeka, i tak zajmuje worker, więc burst credential stuffingu ma odpadać
+# od razu, a nie ustawiać się w kolejce
+LOGIN_CONCURRENCY = int(os.environ.get("LOGIN_CONCURRENCY", "4"))
+LOGIN_WAIT = float(os.environ.get("LOGIN_WAIT", "0.05"))
+
+_login_slots = threading.BoundedSemaphore(LOGIN_CONCURRENCY)
+
+# Jak długo pamiętamy w Redisie, że konto jest aktywne.
+# Zmiana is_active / usunięcie usera czyści wpis od razu (signals.py).
+ACTIVE_TIMEOUT = 300
+
+
+def _active_key(user_id):
+    return f"auth:active:{user_id}"
+
+
+def is_user_active(user_id):
+    active = cache.get(_active_key(user_id))
+    if active is None:
+        active = User.objects.filter(id=user_id, is_active=True).exists()
+        cache.set(_active_key(user_id), active, ACTIVE_TIMEOUT)
+    return active
+
+
+async def ais_user_active(user_id):
+    active = await cache.aget(_active_key(user_id))
+    if active is None:
+        active = await User.objects.filter(id=user_id, is_active=True).aexists()
+        await cache.aset(_active_key(user_id), active, ACTIVE_TIMEOUT)
+    return active
+
+
+def forget_user_active(user_id):
+    cache.delete(_active_key(user_id))
+
+
+class LoginBusy(Exception):
+    pass
+
+
+def verify_credentials(username, password, request=None):
+    """
+    Odpowiednik authenticate() dla logowania: jedno zapytanie o usera
+    (tylko potrzebne kolumny) i hashowanie hasła w wątku requestu
+    (hashlib zwalnia GIL). Jak authenticate() wysyła user_login_failed
+    przy nieudanej próbie. Zwraca User albo None; LoginBusy gdy limit
+    równoległych weryfikacji jest wyczerpany dłużej niż LOGIN_WAIT.
+    """
+    if not _login_slots.acquire(timeout=LOGIN_WAIT):
+        raise LoginBusy()
+
+    try:
+        user = (
+            User.objects.filter(username=username)
+            .only("id", "username", "email", "password", "is_active")
+            .first()
+        )
+
+        with timed("crypto"):
+            if user is None:
+                # Tyle samo pracy co dla istniejącego konta - brak wycieku przez czas odpowiedzi
+                make_password(password)
+                valid = False
+            else:
+                valid = check_password(password, user.password)
+    finally:
+        _login_slots.release()
+
+    if not valid or not user.is_active:
+        # Te same dane co w authenticate() - hasło nie trafia do odbiorców sygnału
+        user_login_failed.send(
+            sender=__name__, credentials={"username": username}, request=request
+        )
+        return None
+
+    # Podbicie parametrów hashera (np. więcej iteracji) poza limitem slotów
+    if identify_hasher(user.password).must_update(user.password):
+        with timed("crypto"):
+            user.set_password(password)
+        user.save(update_fields=["password"])
+
+    return user
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT bez zapytania o wiersz User: request.user to TokenUser zbudowany
+    z claimów (id, username). Dezaktywację sprawdzamy przez cache w Redisie,
+    więc Postgres jest pytany najwyżej raz na ACTIVE_TIMEOUT.
+    Widoki z tą klasą muszą używać request.user.id, nie instancji User.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not is_user_active(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        Wersja authenticate() dla widoków async (zwykły HttpRequest).
+        Zwraca TokenUser albo None, gdy brak nagłówka Authorization.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        user = super().get_user(validated_token)
+        if not await ais_user_active(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+# Jak długo trzymamy wyrenderowaną stronę listy tasków
+TASK_LIST_TIMEOUT = 300
+
+
+def _version_key(user_id):
+    return f"tasks:version:{user_id}"
+
+
+def get_task_list_version(user_id):
+    """
+    Aktualna wersja listy tasków użytkownika. Startuje od time_ns(),
+    więc po utracie klucza w Redisie nowa wersja nigdy nie powtórzy starej
+    (klient ze starym ETagiem nie dostanie fałszywego 304).
+    """
+    return cache.get_or_set(_version_key(user_id), time.time_ns, timeout=None)
+
+
+def bump_task_list_version(user_id):
+    """
+    Unieważnia wszystkie zcache'owane listy użytkownika w O(1):
+    stare klucze przestają być czytane i wygasają same.
+    """
+    key = _version_key(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.incr(key)
+
+
+async def aget_task_list_version(user_id):
+    return await cache.aget_or_set(_version_key(user_id), time.time_ns, timeout=None)
+
+
+async def abump_task_list_version(user_id):
+    key = _version_key(user_id)
+    try:
+        return await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        return await cache.aincr(key)
+
+
+def _params_digest(params):
+    items = sorted((key, value) for key in params for value in params.getlist(key))
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def task_list_cache_key(user_id, version, params):
+    return f"tasks:list:{user_id}:{version}:{_params_digest(params)}"
+
+
+def task_stats_cache_key(user_id, version):
+    # Dzień w kluczu, bo "overdue" zmienia się o północy bez żadnego zapisu
+    return f"tasks:stats:{user_id}:{version}:{timezone.localdate().isoformat()}"
+
+
+def task_list_etag(user_id, version, params):
+    return f'W/"{user_id}-{version}-{_params_digest(params)}"'
+
+
+def etag_matches(request, etag):
+    """
+    Sprawdza If-None-Match (lista ETagów rozdzielona przecinkami albo "*").
+    """
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
@@ -0,0 +1,102 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import x25519
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.primitives.serialization import (
+    Encoding,
+    NoEncryption,
+    PrivateFormat,
+    PublicFormat,
+)
+
+# Uwaga: ten moduł nie importuje niczego z Django - provision_keys
+# wykonuje się w procesach potomnych puli.
+
+KDF_ITERATIONS = 600_000
+
+# Wersja schematu (PBKDF2-SHA256 + X25519 + AES-GCM). Podbijana przy zmianie,
+# która wymaga ponownego opakowania klucza prywatnego (patrz rekey_profiles)
+CRYPTO_VERSION = 1
+
+# Domyślny rozmiar puli na worker Gunicorna. Każdy worker ma własną pulę,
+# więc liczba CPU na worker przy 2 * CPU + 1 workerach daje kilkanaście
+# procesów PBKDF2 na rdzeń - lepiej kolejkować w małej puli
+DEFAULT_POOL_WORKERS = 2
+
+_executor = None
+
+
+def provision_keys(password, salt=None, iterations=KDF_ITERATIONS):
+    """
+    Generuje materiał kryptograficzny nowego użytkownika:
+    salt PBKDF2 (o ile nie podano), parę kluczy X25519 i klucz prywatny
+    zaszyfrowany AES-GCM kluczem wyprowadzonym z hasła.
+    Zwraca słownik samych bajtów.
+    """
+    # 1️⃣ Salt do KDF
+    if salt is None:
+        salt = os.urandom(16)
+
+    # 2️⃣ Wyprowadzenie klucza AES z hasła
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=iterations,
+    )
+    derived_key = kdf.derive(password.encode())  # 32b AES key
+    aesgcm = AESGCM(derived_key)
+    iv = os.urandom(12)
+
+    # 3️⃣ Generacja kluczy ECDH X25519
+    private_key = x25519.X25519PrivateKey.generate()
+
+    # Eksport kluczy w formacie bytes
+    private_bytes = private_key.private_bytes(
+        encoding=Encoding.Raw,
+        format=PrivateFormat.Raw,
+        encryption_algorithm=NoEncryption()
+    )
+    public_bytes = private_key.public_key().public_bytes(
+        encoding=Encoding.Raw,
+        format=PublicFormat.Raw
+    )
+
+    # 4️⃣ Szyfrowanie private key AES-GCM
+    encrypted_private_key = aesgcm.encrypt(iv, private_bytes, None)
+
+    return {
+        "kdf_salt": salt,
+        "kdf_iterations": iterations,
+        "crypto_version": CRYPTO_VERSION,
+        "public_key": public_bytes,
+        "encrypted_private_key": encrypted_private_key,
+        "iv": iv,
+    }
+
+
+def needs_rekey(crypto_version, kdf_iterations):
+    """
+    Czy klucz prywatny jest opakowany słabiej niż obecne parametry.
+    """
+    return crypto_version < CRYPTO_VERSION or kdf_iterations < KDF_ITERATIONS
+
+
+def get_executor():
+    """
+    Leniwie tworzona pula procesów do pracy CPU-bound (PBKDF2).
+    Tworzona dopiero w workerze (po forku Gunicorna), startuje przez
+    "spawn", żeby dzieci nie dziedziczyły połączeń do bazy ani wątków.
+    """
+    global _executor
+    if _executor is None:
+        workers = int(os.environ.get("CRYPTO_POOL_WORKERS", DEFAULT_POOL_WORKERS))
+        _executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
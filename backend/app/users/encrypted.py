@@ -0,0 +1,164 @@
+import struct
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EncryptedObject
+
+CONTENT_TYPE = "application/octet-stream"
+
+# Ramka odpowiedzi: id, updated_at (µs od epoki), długość, potem surowy ciphertext
+FRAME_HEADER = struct.Struct(">qqI")
+
+# Ramka zapisu: id (0 = nowy obiekt), długość, potem surowy ciphertext
+UPLOAD_HEADER = struct.Struct(">qI")
+
+MAX_BATCH_SIZE = 1000
+MAX_OBJECT_SIZE = 8 * 1024 * 1024
+MAX_BATCH_BYTES = 32 * 1024 * 1024
+
+# Ile ciphertextów naraz pobiera kursor po stronie serwera
+FETCH_CHUNK_SIZE = 100
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def to_micros(moment):
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+
+def from_micros(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def encode_since(updated_at, pk):
+    """
+    Kursor przyrostowego pobierania: "<updated_at w µs>-<id>" ostatniej ramki.
+    """
+    return f"{to_micros(updated_at)}-{pk}"
+
+
+def decode_since(cursor):
+    """
+    Odwrotność encode_since. Rzuca ValueError dla zepsutego kursora.
+    """
+    micros, pk = cursor.split("-")
+    try:
+        return from_micros(int(micros)), int(pk)
+    except OverflowError as exc:
+        # Znacznik poza zakresem datetime (np. 99999999999999999999)
+        raise ValueError("invalid cursor") from exc
+
+
+def objects_since(user_id, object_type, since, limit):
+    """
+    Strona obiektów zmienionych po kursorze, posortowana po (updated_at, id).
+    Najpierw same klucze (index-only scan po indeksie user/object_type/updated_at/id),
+    dzięki czemu nagłówki są znane przed strumieniowaniem ciphertextów.
+    Zwraca (rows, next_since, has_more); rows to iterator (id, updated_at, ciphertext).
+    """
+    objects = EncryptedObject.objects.filter(user_id=user_id, object_type=object_type)
+
+    if since:
+        updated_at, pk = decode_since(since)
+        objects = objects.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+
+    keys = list(objects.order_by("updated_at", "id").values_list("id", "updated_at")[:limit + 1])
+    has_more = len(keys) > limit
+    keys = keys[:limit]
+
+    next_since = encode_since(keys[-1][1], keys[-1][0]) if keys else since
+    rows = (
+        EncryptedObject.objects.filter(id__in=[pk for pk, _ in keys])
+        .order_by("updated_at", "id")
+        .values_list("id", "updated_at", "ciphertext")
+        .iterator(chunk_size=FETCH_CHUNK_SIZE)
+    ) if keys else iter(())
+
+    return rows, next_since, has_more
+
+
+def iter_frames(rows):
+    """
+    Nagłówek ramki i ciphertext idą jako osobne kawałki - bez sklejania
+    w jeden bufor, więc duży obiekt nie jest kopiowany przed wysłaniem.
+    """
+    for pk, updated_at, ciphertext in rows:
+        yield FRAME_HEADER.pack(pk, to_micros(updated_at), len(ciphertext))
+        yield ciphertext
+
+
+def read_frames(stream):
+    """
+    Czyta ramki zapisu z body. Zwraca listę (id, ciphertext).
+    Rzuca ValueError dla uciętej ramki albo przekroczonych limitów.
+    """
+    frames = []
+    seen = set()
+    total = 0
+
+    while True:
+        header = stream.read(UPLOAD_HEADER.size)
+        if not header:
+            return frames
+        if len(header) < UPLOAD_HEADER.size:
+            raise ValueError("Truncated frame header")
+
+        pk, length = UPLOAD_HEADER.unpack(header)
+        if pk < 0:
+            raise ValueError("Invalid object id")
+        if pk and pk in seen:
+            raise ValueError("Each id may appear only once")
+        seen.add(pk)
+        if length > MAX_OBJECT_SIZE:
+            raise ValueError(f"Objects may be at most {MAX_OBJECT_SIZE} bytes")
+
+        total += length
+        if len(frames) >= MAX_BATCH_SIZE or total > MAX_BATCH_BYTES:
+            raise ValueError(
+                f"At most {MAX_BATCH_SIZE} objects and {MAX_BATCH_BYTES} bytes per request"
+            )
+
+        ciphertext = stream.read(length)
+        if len(ciphertext) < length:
+            raise ValueError("Truncated frame body")
+        frames.append((pk, ciphertext))
+
+
+def save_objects(user_id, object_type, frames):
+    """
+    Zapis paczki w jednej transakcji: bulk_create dla nowych obiektów,
+    jeden SELECT ... FOR UPDATE i bulk_update dla istniejących.
+    Zwraca {"created", "updated", "not_found"} - created w kolejności ramek.
+    """
+    updates = {pk: ciphertext for pk, ciphertext in frames if pk}
+
+    with transaction.atomic():
+        created = EncryptedObject.objects.bulk_create([
+            EncryptedObject(user_id=user_id, object_type=object_type, ciphertext=ciphertext)
+            for pk, ciphertext in frames if not pk
+        ])
+
+        existing = (
+            EncryptedObject.objects.select_for_update()
+            .filter(user_id=user_id, object_type=object_type, id__in=updates)
+            .only("id")
+            .in_bulk()
+        )
+
+        # bulk_update omija auto_now
+        now = timezone.now()
+        for pk, obj in existing.items():
+            obj.ciphertext = updates[pk]
+            obj.updated_at = now
+
+        if existing:
+            EncryptedObject.objects.bulk_update(existing.values(), ["ciphertext", "updated_at"])
+
+    return {
+        "created": [{"id": obj.id, "updated_at": to_micros(obj.updated_at)} for obj in created],
+        "updated": [{"id": pk, "updated_at": to_micros(now)} for pk in updates if pk in existing],
+        "not_found": [pk for pk in updates if pk not in existing],
+    }
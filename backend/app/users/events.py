@@ -0,0 +1,197 @@
+import asyncio
+import json
+import logging
+import threading
+
+import redis
+import redis.asyncio
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+logger = logging.getLogger(__name__)
+
+
+def _channel(user_id):
+    return f"tasks:events:{user_id}"
+
+
+# Znacznik końca strumienia wrzucany do kolejek słuchaczy po utracie subskrypcji
+_CLOSED = object()
+
+
+def _user_id(channel):
+    return int(channel.decode().rsplit(":", 1)[1])
+
+
+class RedisBroker:
+    """
+    Pub/sub w Redisie - zdarzenia docierają do wszystkich procesów i maszyn.
+    Proces ma jedno połączenie subskrypcji na wszystkie strumienie SSE:
+    jedno zadanie asyncio czyta je i rozdziela wiadomości do kolejek
+    lokalnych słuchaczy, a kanał usera jest subskrybowany, dopóki ma on
+    w tym procesie choć jeden otwarty strumień.
+    """
+
+    # Co ile sekund połączenie subskrypcji jest sprawdzane PING-iem
+    HEALTH_CHECK_INTERVAL = 30
+
+    def __init__(self, url):
+        self.url = url
+        self._client = None
+        self._loop = None
+        self._lock = None
+        self._pubsub = None
+        self._reader = None
+        self._listeners = {}
+
+    def _timeouts(self):
+        return {
+            "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+            "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        }
+
+    def publish(self, user_id, message):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url, **self._timeouts())
+        self._client.publish(_channel(user_id), message)
+
+    async def listen(self, user_id, timeout):
+        """
+        Async generator: kolejne wiadomości (str) albo None po `timeout`
+        sekundach ciszy (okazja do heartbeat). Kończy się po utracie
+        połączenia z Redisem - klient łączy się ponownie i dociąga zmiany.
+        """
+        queue = asyncio.Queue()
+        await self._subscribe(user_id, queue)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message is _CLOSED:
+                    return
+                yield message
+        finally:
+            await self._unsubscribe(user_id, queue)
+
+    async def _subscribe(self, user_id, queue):
+        loop = asyncio.get_running_loop()
+        if self._pubsub is None or self._loop is not loop:
+            # Połączenie tworzone leniwie w pętli workera (i od nowa po awarii)
+            client = redis.asyncio.Redis.from_url(
+                self.url, health_check_interval=self.HEALTH_CHECK_INTERVAL, **self._timeouts()
+            )
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._pubsub = client.pubsub()
+            self._reader = None
+            self._listeners = {}
+
+        pubsub = self._pubsub
+        async with self._lock:
+            queues = self._listeners.setdefault(user_id, set())
+            if not queues:
+                await pubsub.subscribe(_channel(user_id))
+            queues.add(queue)
+
+        if self._reader is None:
+            self._reader = loop.create_task(self._read(pubsub))
+
+    async def _unsubscribe(self, user_id, queue):
+        pubsub = self._pubsub
+        queues = self._listeners.get(user_id)
+        if pubsub is None or queues is None:
+            return  # subskrypcja już zamknięta przez _read
+
+        async with self._lock:
+            queues.discard(queue)
+            if queues:
+                return
+            del self._listeners[user_id]
+            try:
+                await pubsub.unsubscribe(_channel(user_id))
+            except redis.RedisError:
+                logger.warning("Could not unsubscribe task events for user %s", user_id, exc_info=True)
+
+    async def _read(self, pubsub):
+        try:
+            while True:
+                # Jawny timeout odczytu - cisza na kanałach to nie błąd socket_timeout
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message is None or message["type"] != "message":
+                    continue
+                data = message["data"].decode()
+                for queue in self._listeners.get(_user_id(message["channel"]), ()):
+                    queue.put_nowait(data)
+        except redis.RedisError:
+            logger.warning("Task events subscription lost", exc_info=True)
+        finally:
+            if self._pubsub is pubsub:
+                listeners, self._listeners = self._listeners, {}
+                self._pubsub = self._reader = None
+                for queues in listeners.values():
+                    for queue in queues:
+                        queue.put_nowait(_CLOSED)
+            try:
+                await pubsub.aclose()
+            except redis.RedisError:
+                pass
+
+
+class InProcessBroker:
+    """
+    Broker w pamięci jednego procesu - do lokalnego developmentu i testów
+    bez Redisa (TASK_EVENTS_BACKEND=memory). Publikować można z dowolnego
+    wątku, słuchacze żyją w pętli asyncio.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def publish(self, user_id, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, message)
+
+    async def listen(self, user_id, timeout):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscriber)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber[1].get(), timeout)
+                except asyncio.TimeoutError:
+                    yield None
+        finally:
+            with self._lock:
+                self._subscribers[user_id].discard(subscriber)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        if settings.TASK_EVENTS_BACKEND == "memory":
+            _broker = InProcessBroker()
+        else:
+            _broker = RedisBroker(settings.REDIS_URL)
+    return _broker
+
+
+def publish_task_event(user_id, event_type, **payload):
+    """
+    Wysyła zdarzenie o zmianie tasków do wszystkich urządzeń użytkownika.
+    Awaria brokera nie psuje zapisu - klient i tak dogoni stan przez /tasks/sync/.
+    """
+    message = json.dumps({"type": event_type, **payload}, cls=DjangoJSONEncoder)
+    try:
+        get_broker().publish(user_id, message)
+    except redis.RedisError:
+        logger.warning("Could not publish task event for user %s", user_id, exc_info=True)
@@ -0,0 +1,56 @@
+import csv
+
+import orjson
+
+from .models import Task
+from .serializers import TaskSerializer
+
+EXPORT_COLUMNS = TaskSerializer.Meta.fields
+
+# Ile wierszy naraz pobiera kursor po stronie serwera
+EXPORT_CHUNK_SIZE = 2000
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+class _Echo:
+    """
+    Pseudo-bufor dla csv.writer - write() zwraca linię zamiast ją zapisywać.
+    """
+
+    def write(self, value):
+        return value
+
+
+def export_rows(user_id):
+    """
+    Wszystkie taski użytkownika jako krotki, strumieniowo przez
+    server-side cursor (.iterator) - pamięć nie rośnie z liczbą tasków.
+    """
+    return (
+        Task.objects.filter(user_id=user_id)
+        .order_by("-created_at", "-id")
+        .values_list(*EXPORT_COLUMNS)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield orjson.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n"
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        yield writer.writerow(["" if value is None else value for value in row])
+
+
+EXPORTERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
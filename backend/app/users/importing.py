@@ -0,0 +1,161 @@
+import csv
+import json
+from datetime import date
+
+from django.db import transaction
+
+from .models import Task
+
+IMPORT_BATCH_SIZE = 1000
+
+# Błędy trzymamy dla pierwszych N wierszy, żeby raport miał ograniczony rozmiar
+MAX_REPORTED_ERRORS = 1000
+
+PRIORITIES = {value for value, _ in Task.PRIORITY_CHOICES}
+STATUSES = {value for value, _ in Task.STATUS_CHOICES}
+TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+
+TRUE_VALUES = {True, "true", "1", "yes", "tak"}
+FALSE_VALUES = {False, None, "", "false", "0", "no", "nie"}
+
+
+def iter_ndjson(lines):
+    """
+    (numer_wiersza, słownik) dla każdej niepustej linii NDJSON.
+    Zepsuty JSON daje (numer, None) - trafia do raportu błędów.
+    """
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def iter_csv(lines):
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record
+
+
+PARSERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
+
+
+def _text(record, field, errors):
+    """
+    Pole tekstowe rekordu; brak to "". Inny typ niż str (liczba, lista,
+    obiekt z NDJSON) trafia do błędów wiersza zamiast wywracać import.
+    """
+    value = record.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        errors[field] = "Not a valid string."
+        return ""
+    if "\x00" in value:
+        # Postgres nie przyjmuje NUL w tekście (DataError w połowie importu)
+        errors[field] = "Null characters are not allowed."
+        return ""
+    return value
+
+
+def clean_record(record):
+    """
+    Lekka walidacja pod ograniczenia modelu Task (bez DRF na każdy wiersz).
+    Zwraca (dane, None) albo (None, {pole: komunikat}).
+    """
+    if record is None:
+        return None, {"row": "Invalid record"}
+
+    errors = {}
+    data = {}
+
+    title = _text(record, "title", errors).strip()
+    if not title and "title" not in errors:
+        errors["title"] = "This field is required."
+    elif len(title) > TITLE_MAX_LENGTH:
+        errors["title"] = f"Ensure this field has no more than {TITLE_MAX_LENGTH} characters."
+    data["title"] = title
+
+    data["description"] = _text(record, "description", errors)
+
+    priority = _text(record, "priority", errors) or "medium"
+    if "priority" not in errors and priority not in PRIORITIES:
+        errors["priority"] = f'"{priority}" is not a valid choice.'
+    data["priority"] = priority
+
+    status = _text(record, "status", errors) or "pending"
+    if "status" not in errors and status not in STATUSES:
+        errors["status"] = f'"{status}" is not a valid choice.'
+    data["status"] = status
+
+    important = record.get("is_important")
+    important = important.lower() if isinstance(important, str) else important
+    # Listy i obiekty z NDJSON są niehashowalne - sprawdzamy je przed "in"
+    if isinstance(important, (list, dict)):
+        errors["is_important"] = "Must be a valid boolean."
+    elif important in TRUE_VALUES:
+        data["is_important"] = True
+    elif important in FALSE_VALUES:
+        data["is_important"] = False
+    else:
+        errors["is_important"] = "Must be a valid boolean."
+
+    deadline = record.get("deadline") or None
+    if deadline is not None:
+        try:
+            deadline = date.fromisoformat(deadline)
+        except (TypeError, ValueError):
+            errors["deadline"] = "Date has wrong format. Use YYYY-MM-DD."
+    data["deadline"] = deadline
+
+    return (None, errors) if errors else (data, None)
+
+
+def import_tasks(user_id, records, batch_size=IMPORT_BATCH_SIZE, on_progress=None):
+    """
+    Waliduje i zapisuje rekordy paczkami przez bulk_create - w pamięci jest
+    najwyżej jedna paczka. Każda paczka to osobna transakcja, więc przerwany
+    import zostawia zapisane wcześniejsze paczki.
+    Zwraca raport {"created", "error_count", "errors"}; plik, którego nie da
+    się czytać dalej (złe kodowanie, zepsuty CSV), kończy import z kluczem
+    "aborted" - wiersze przed nim są zapisane.
+    """
+    report = {"created": 0, "error_count": 0, "errors": []}
+    number = 0
+    batch = []
+
+    def flush():
+        with transaction.atomic():
+            Task.objects.bulk_create(batch, batch_size=batch_size)
+        report["created"] += len(batch)
+        batch.clear()
+        if on_progress:
+            on_progress(report)
+
+    try:
+        for number, record in records:
+            data, errors = clean_record(record)
+            if errors:
+                report["error_count"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    report["errors"].append({"row": number, "errors": errors})
+                continue
+
+            batch.append(Task(user_id=user_id, **data))
+            if len(batch) >= batch_size:
+                flush()
+    except UnicodeDecodeError:
+        report["aborted"] = {"after_row": number, "error": "File must be UTF-8"}
+    except csv.Error as exc:
+        report["aborted"] = {"after_row": number, "error": f"Malformed CSV: {exc}"}
+
+    if batch:
+        flush()
+
+    return report
@@ -0,0 +1,142 @@
+import base64
+import hashlib
+import time
+
+import orjson
+from django.core.cache import cache
+
+from .crypto import needs_rekey
+from .models import UserProfile
+from .serializers import safe_b64encode
+
+# Materiał kluczy zmienia się tylko przy rejestracji i re-keyingu, a każda
+# zmiana podbija wersję - wpisy w Redisie mogą więc żyć długo
+KEYS_TIMEOUT = 24 * 3600
+
+# Max-age dla klienta. Stary pakiet nadal jest spójny (ten sam klucz
+# prywatny pod starymi parametrami KDF), a ETag pozwala go tanio odświeżyć
+BUNDLE_MAX_AGE = 24 * 3600
+PUBLIC_KEYS_MAX_AGE = 3600
+
+MAX_PUBLIC_KEYS = 100
+
+BUNDLE_FIELDS = ("crypto_version", "kdf_salt", "kdf_iterations", "public_key", "encrypted_private_key", "iv")
+BINARY_FIELDS = {"kdf_salt", "public_key", "encrypted_private_key", "iv"}
+
+
+def _version_key(user_id):
+    return f"keys:version:{user_id}"
+
+
+def get_keys_versions(user_ids):
+    """
+    Wersje materiału kluczy dla wielu userów: jeden get_many i jeden
+    set_many dla brakujących, które startują od time_ns(), tak jak wersje
+    listy tasków. set_many może nadpisać równoległy bump, ale nowa wartość
+    nie miała jeszcze wpisów w cache, więc nie poda starego pakietu.
+    """
+    keys = {_version_key(user_id): user_id for user_id in user_ids}
+    versions = {keys[key]: version for key, version in cache.get_many(keys).items()}
+
+    start = time.time_ns()
+    missing = {key: start for key, user_id in keys.items() if user_id not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update({keys[key]: version for key, version in missing.items()})
+
+    return versions
+
+
+def bump_keys_version(user_id):
+    """
+    Unieważnia pakiet i klucz publiczny usera w Redisie. Wołane po każdej
+    zmianie UserProfile (sygnał, provisioning, re-keying).
+    """
+    key = _version_key(user_id)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+        return cache.incr(key)
+
+
+def _etag(data):
+    # Silny ETag z treści - identyczne bajty odpowiedzi po obu stronach
+    digest = hashlib.sha256(orjson.dumps(data, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def get_key_bundle(user_id):
+    """
+    Pakiet kluczy usera (base64) i jego ETag, z Redisa albo z jednego
+    zapytania o profil. None, gdy user nie ma profilu.
+    """
+    version = get_keys_versions([user_id])[user_id]
+    cache_key = f"keys:bundle:{user_id}:{version}"
+
+    cached = cache.get(cache_key)
+    if cached is None:
+        row = UserProfile.objects.filter(user_id=user_id).values(*BUNDLE_FIELDS).first()
+        if row is None:
+            return None
+
+        bundle = {
+            field: safe_b64encode(value) if field in BINARY_FIELDS else value
+            for field, value in row.items()
+        }
+        # Klient po "rekey": true opakowuje klucz ponownie i wysyła PUT /api/keys/.
+        # Profile sprzed zapisywania IV też - klient ma IV tylko z rejestracji
+        bundle["rekey"] = (
+            row["iv"] is None and row["encrypted_private_key"] is not None
+        ) or needs_rekey(row["crypto_version"], row["kdf_iterations"])
+        cached = (bundle, _etag(bundle))
+        cache.set(cache_key, cached, KEYS_TIMEOUT)
+
+    return cached
+
+
+def replace_key_bundle(user_id, current, wrapped):
+    """
+    Zapisuje klucz prywatny opakowany ponownie przez klienta, o ile profil
+    nadal ma pakiet current (warunkowy UPDATE). False, gdy ktoś był szybszy.
+    """
+    updated = UserProfile.objects.filter(
+        user_id=user_id,
+        crypto_version=current["crypto_version"],
+        kdf_iterations=current["kdf_iterations"],
+        encrypted_private_key=base64.b64decode(current["encrypted_private_key"]),
+    ).update(**wrapped)
+
+    if updated:
+        # update() nie wysyła post_save
+        bump_keys_version(user_id)
+    return bool(updated)
+
+
+def get_public_keys(user_ids):
+    """
+    Klucze publiczne wielu userów: dwa get_many w Redisie i jedno zapytanie
+    tylko o brakujących. Zwraca listę w kolejności user_ids (bez nieznanych)
+    i ETag listy.
+    """
+    versions = get_keys_versions(user_ids)
+    cache_keys = {f"keys:public:{user_id}:{versions[user_id]}": user_id for user_id in user_ids}
+
+    entries = {cache_keys[key]: entry for key, entry in cache.get_many(cache_keys).items()}
+    missing = [user_id for user_id in user_ids if user_id not in entries]
+
+    if missing:
+        fresh = {
+            user_id: {"crypto_version": crypto_version, "public_key": safe_b64encode(public_key)}
+            for user_id, crypto_version, public_key in UserProfile.objects.filter(
+                user_id__in=missing
+            ).values_list("user_id", "crypto_version", "public_key")
+        }
+        cache.set_many(
+            {f"keys:public:{user_id}:{versions[user_id]}": entry for user_id, entry in fresh.items()},
+            KEYS_TIMEOUT,
+        )
+        entries.update(fresh)
+
+    keys = [{"id": user_id, **entries[user_id]} for user_id in user_ids if user_id in entries]
+    return keys, _etag(keys)
@@ -0,0 +1,42 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy koszt połączenia z bazą na request przy bieżącej konfiguracji. "
+        "Uruchom kolejno z DB_CONN_MAX_AGE=0, DB_CONN_MAX_AGE=60 i DB_POOL=1 "
+        "(np. docker compose run --rm -e DB_POOL=1 web python manage.py bench_db_connections)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        if settings_dict["OPTIONS"].get("pool"):
+            mode = "pool"
+        else:
+            mode = f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}"
+
+        timings = []
+        for _ in range(options["requests"]):
+            # Sygnały cyklu requestu - na nich Django zamyka albo oddaje
+            # połączenie (close_old_connections), tak jak pod Gunicornem
+            start = time.perf_counter()
+            request_started.send(sender=self.__class__)
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        self.stdout.write(f"mode:     {mode}")
+        self.stdout.write(f"requests: {len(timings)}")
+        self.stdout.write(f"avg:      {statistics.mean(timings):.2f} ms")
+        self.stdout.write(f"p50:      {timings[len(timings) // 2]:.2f} ms")
+        self.stdout.write(f"p95:      {timings[int(len(timings) * 0.95) - 1]:.2f} ms")
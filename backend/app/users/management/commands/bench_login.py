@@ -0,0 +1,44 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy logowania na sekundę na jednym rdzeniu (sekwencyjnie, pełny "
+        "widok /api/login/ z hasherem) i liczbę zapytań na logowanie. "
+        "Użytkownik testowy jest wycofywany na końcu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=20)
+
+    def handle(self, *args, **options):
+        client = APIClient()
+        password = "Bench-Passw0rd!"
+
+        with transaction.atomic():
+            username = f"bench_{uuid.uuid4().hex[:12]}"
+            User.objects.create_user(username=username, password=password)
+            payload = {"username": username, "password": password}
+
+            failures = 0
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                for _ in range(options["requests"]):
+                    response = client.post("/api/login/", payload, format="json")
+                    failures += response.status_code != 200
+                elapsed = time.perf_counter() - start
+
+            transaction.set_rollback(True)
+
+        count = options["requests"]
+        self.stdout.write(f"logins:           {count} ({failures} failed)")
+        self.stdout.write(f"logins / s / core: {count / elapsed:.1f}")
+        self.stdout.write(f"avg latency:      {elapsed / count * 1000:.1f} ms")
+        self.stdout.write(f"queries / login:  {len(queries) / count:.1f}")
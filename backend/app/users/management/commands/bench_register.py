@@ -0,0 +1,58 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+
+class Command(BaseCommand):
+    help = (
+        "Mierzy liczbę zapytań do bazy i czas ścianowy na jedną rejestrację. "
+        "Wszystko dzieje się w transakcji wycofywanej na końcu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=10, help="Liczba rejestracji")
+        parser.add_argument(
+            "--deferred",
+            action="store_true",
+            help="Użyj trybu Prefer: respond-async (krypto w puli procesów)",
+        )
+
+    def handle(self, *args, **options):
+        client = APIClient()
+        headers = {"HTTP_PREFER": "respond-async"} if options["deferred"] else {}
+        timings = []
+        query_counts = []
+
+        with transaction.atomic():
+            for _ in range(options["count"]):
+                name = f"bench_{uuid.uuid4().hex[:12]}"
+                payload = {
+                    "username": name,
+                    "email": f"{name}@example.com",
+                    "password": "Bench-Passw0rd!",
+                }
+
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    response = client.post("/api/register/", payload, format="json", **headers)
+                    timings.append(time.perf_counter() - start)
+
+                if response.status_code not in (201, 202):
+                    self.stderr.write(f"Unexpected {response.status_code}: {response.content[:200]!r}")
+                    break
+                query_counts.append(len(queries))
+
+            transaction.set_rollback(True)
+
+        if not query_counts:
+            return
+
+        count = len(query_counts)
+        self.stdout.write(f"signups:          {count}")
+        self.stdout.write(f"queries / signup: {sum(query_counts) / count:.1f} (max {max(query_counts)})")
+        self.stdout.write(f"avg wall time:    {sum(timings) / count * 1000:.1f} ms")
+        self.stdout.write(f"max wall time:    {max(timings) * 1000:.1f} ms")
@@ -0,0 +1,64 @@
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from users.models import Task
+from users.queries import project_rows, task_list_values
+from users.renderers import ORJSONRenderer
+from users.serializers import TaskSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Porównuje odczyt listy tasków: instancje + TaskSerializer + JSONRenderer "
+        "kontra .values() + ORJSONRenderer. Dane tworzone w transakcji wycofywanej na końcu."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000])
+        parser.add_argument("--repeat", type=int, default=3, help="Bierzemy najlepszy z N pomiarów")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            for size in options["sizes"]:
+                user = User.objects.create_user(username=f"bench_{uuid.uuid4().hex[:12]}")
+                Task.objects.bulk_create(
+                    [
+                        Task(user=user, title=f"Task {i}", description="x" * 200)
+                        for i in range(size)
+                    ],
+                    batch_size=5000,
+                )
+                tasks = Task.objects.filter(user=user).defer("search_vector").order_by("-created_at", "-id")
+
+                current = self.best_of(options["repeat"], lambda: self.current_path(tasks))
+                fast = self.best_of(options["repeat"], lambda: self.fast_path(tasks))
+
+                self.stdout.write(
+                    f"{size:>7} tasks: serializer {current * 1000:9.1f} ms | "
+                    f"values+orjson {fast * 1000:9.1f} ms | x{current / fast:.1f}"
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def current_path(tasks):
+        return JSONRenderer().render(TaskSerializer(tasks, many=True).data)
+
+    @staticmethod
+    def fast_path(tasks):
+        rows, columns = task_list_values(tasks, None)
+        return ORJSONRenderer().render(project_rows(list(rows), columns))
+
+    @staticmethod
+    def best_of(repeat, func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
@@ -0,0 +1,50 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+
+from users import events
+
+
+class Command(BaseCommand):
+    help = (
+        "Sprawdza kanał zdarzeń tasków end-to-end: subskrybuje, publikuje "
+        "zdarzenie z innego wątku (jak widok sync) i czeka na nie. "
+        "--backend memory działa bez Redisa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--backend", choices=["redis", "memory"], help="Nadpisuje TASK_EVENTS_BACKEND")
+        parser.add_argument("--user-id", type=int, default=0)
+        parser.add_argument("--timeout", type=float, default=5.0)
+
+    def handle(self, *args, **options):
+        if options["backend"] == "memory":
+            events._broker = events.InProcessBroker()
+        elif options["backend"] == "redis":
+            from django.conf import settings
+            events._broker = events.RedisBroker(settings.REDIS_URL)
+
+        broker = events.get_broker()
+        received = asyncio.run(self.roundtrip(broker, options["user_id"], options["timeout"]))
+
+        if received is None:
+            raise CommandError(f"No event received within {options['timeout']}s ({type(broker).__name__})")
+
+        event = json.loads(received)
+        if event != {"type": "ping", "id": options["user_id"]}:
+            raise CommandError(f"Unexpected event: {event!r}")
+
+        self.stdout.write(self.style.SUCCESS(f"OK: {type(broker).__name__} delivered {received}"))
+
+    async def roundtrip(self, broker, user_id, timeout):
+        stream = broker.listen(user_id, timeout)
+        try:
+            # Pierwsze wywołanie subskrybuje; publikujemy dopiero gdy kanał słucha
+            first = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.1)
+            await sync_to_async(events.publish_task_event)(user_id, "ping", id=user_id)
+            return await first
+        finally:
+            await stream.aclose()
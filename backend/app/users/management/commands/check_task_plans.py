@@ -0,0 +1,90 @@
+import random
+import uuid
+from itertools import product
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from users.management.commands.seed_tasks import random_task
+from users.models import Task
+from users.queries import task_list_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Zasiewa tabelę tasków (domyślnie 100 userów x 10 000 = 1M wierszy) "
+        "w transakcji wycofywanej na końcu, robi ANALYZE i uruchamia EXPLAIN "
+        "dla każdej kombinacji filtrów TaskView. Kończy się błędem, jeśli "
+        "któreś zapytanie robi Seq Scan na tabeli tasków. Tylko Postgres."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=10_000, help="Tasków na usera")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--verbose-plans", action="store_true", help="Wypisz pełne plany")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("Plany zapytań sprawdzamy tylko na Postgresie")
+
+        with transaction.atomic():
+            user_id = self.seed(options)
+            failures = self.check_plans(user_id, options["verbose_plans"])
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f"Seq Scan in {len(failures)} queries: {', '.join(failures)}")
+
+        self.stdout.write(self.style.SUCCESS("Wszystkie zapytania korzystają z indeksów."))
+
+    def seed(self, options):
+        rng = random.Random(options["seed"])
+        today = timezone.localdate()
+        prefix = f"plans_{uuid.uuid4().hex[:8]}_"
+
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}{number}") for number in range(options["users"])]
+        )
+        for user in users:
+            Task.objects.bulk_create(
+                [random_task(rng, user.id, today) for _ in range(options["tasks"])],
+                batch_size=5000,
+            )
+
+        # Świeże statystyki - bez nich planer zakłada pustą tabelę
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Task._meta.db_table}")
+
+        self.stdout.write(f"Zasiano {len(users) * options['tasks']} tasków")
+        return users[0].id
+
+    def check_plans(self, user_id, verbose):
+        table = Task._meta.db_table
+        statuses = [None] + [value for value, _ in Task.STATUS_CHOICES]
+        queries = {}
+
+        # Lista: status x important x search, dokładnie to samo zapytanie co w TaskView.get
+        for status_value, important, search in product(statuses, [None, "true"], [None, "raport"]):
+            params = {"status": status_value, "important": important, "search": search}
+            label = f"list status={status_value} important={important} search={search}"
+            queries[label], _, _ = task_list_queryset(user_id, params)
+
+        # Lookup po (id, user) z put/delete
+        last = Task.objects.filter(user_id=user_id).order_by("-id").first()
+        queries["lookup id+user"] = Task.objects.filter(id=last.id, user_id=user_id)
+
+        failures = []
+        for label, queryset in queries.items():
+            plan = queryset.explain()
+            seq_scan = f"Seq Scan on {table}" in plan
+            if seq_scan:
+                failures.append(label)
+
+            self.stdout.write(f"{'SEQ ' if seq_scan else 'OK  '} {label}")
+            if verbose:
+                self.stdout.write(plan + "\n")
+
+        return failures
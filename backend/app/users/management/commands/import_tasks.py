@@ -0,0 +1,70 @@
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from users.cache import bump_task_list_version
+from users.importing import IMPORT_BATCH_SIZE, PARSERS, import_tasks
+
+
+class Command(BaseCommand):
+    help = "Importuje taski użytkownika z pliku NDJSON albo CSV (strumieniowo, paczkami)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("path", help="Ścieżka do pliku albo - dla stdin")
+        parser.add_argument("--type", choices=sorted(PARSERS), help="Domyślnie z rozszerzenia pliku")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['username']!r} does not exist")
+
+        path = options["path"]
+        import_type = options["type"] or path.rsplit(".", 1)[-1].lower()
+        if import_type not in PARSERS:
+            raise CommandError("Cannot guess the type from the file name, use --type ndjson|csv")
+
+        start = time.perf_counter()
+
+        def progress(report):
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"\r{report['created']} zapisanych, {report['error_count']} błędów, "
+                f"{report['created'] / elapsed:.0f} wierszy/s",
+                ending="",
+            )
+            self.stdout.flush()
+
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8-sig", newline="")
+        try:
+            report = import_tasks(
+                user.id,
+                PARSERS[import_type](stream),
+                batch_size=options["batch_size"],
+                on_progress=progress,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if report["created"]:
+            bump_task_list_version(user.id)
+
+        self.stdout.write("")
+        for error in report["errors"]:
+            self.stderr.write(f"wiersz {error['row']}: {error['errors']}")
+
+        if "aborted" in report:
+            raise CommandError(
+                f"Import przerwany po wierszu {report['aborted']['after_row']}: "
+                f"{report['aborted']['error']} (zapisano {report['created']} tasków)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Zaimportowano {report['created']} tasków w {time.perf_counter() - start:.1f} s, "
+            f"{report['error_count']} wierszy odrzuconych."
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from users.models import TaskTombstone
+from users.sync import TOMBSTONE_RETENTION
+
+
+class Command(BaseCommand):
+    help = "Usuwa tombstony tasków starsze niż TOMBSTONE_RETENTION (do uruchamiania z crona)."
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - TOMBSTONE_RETENTION
+        deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+        self.stdout.write(f"Usunięto {deleted} tombstonów starszych niż {cutoff.isoformat()}.")
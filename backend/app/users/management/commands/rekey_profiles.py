@@ -0,0 +1,74 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from users.crypto import CRYPTO_VERSION, KDF_ITERATIONS
+from users.events import publish_task_event
+from users.keys import bump_keys_version
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Rozpoczyna re-keying po podniesieniu CRYPTO_VERSION / KDF_ITERATIONS: "
+        "przechodzi profile z niższymi parametrami paczkami po id, unieważnia "
+        "ich pakiety kluczy w Redisie (klient dostaje \"rekey\": true) i wysyła "
+        "zdarzenie rekey_required do urządzeń usera. Samo przepakowanie robi "
+        "klient (PUT /api/keys/) - serwer nie zna hasła. Postęp jest zapisywany "
+        "w Redisie, więc przerwane uruchomienie rusza od ostatniej paczki."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause", type=float, default=1.0,
+            help="Sekundy przerwy między paczkami, żeby nie zalać Redisa i klientów",
+        )
+        parser.add_argument("--max-batches", type=int, help="Zatrzymaj się po N paczkach")
+        parser.add_argument("--reset", action="store_true", help="Zacznij od początku zamiast od checkpointu")
+
+    def handle(self, *args, **options):
+        # Checkpoint per docelowe parametry - kolejny rollout zaczyna od zera
+        checkpoint_key = f"rekey:checkpoint:{CRYPTO_VERSION}:{KDF_ITERATIONS}"
+        if options["reset"]:
+            cache.delete(checkpoint_key)
+
+        last_id = cache.get(checkpoint_key, 0)
+        # Profile bez zapisanego IV (sprzed migracji 0010) też - jak flaga "rekey" w keys.py
+        stale = UserProfile.objects.filter(
+            Q(crypto_version__lt=CRYPTO_VERSION)
+            | Q(kdf_iterations__lt=KDF_ITERATIONS)
+            | Q(iv__isnull=True, encrypted_private_key__isnull=False)
+        )
+
+        self.stdout.write(f"Start od profilu id > {last_id}")
+        batches = notified = 0
+
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            rows = list(
+                stale.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "user_id")[:options["batch_size"]]
+            )
+            if not rows:
+                break
+
+            for _, user_id in rows:
+                bump_keys_version(user_id)
+                publish_task_event(user_id, "rekey_required")
+
+            last_id = rows[-1][0]
+            cache.set(checkpoint_key, last_id, timeout=None)
+            batches += 1
+            notified += len(rows)
+            self.stdout.write(f"\r{notified} profili, checkpoint id {last_id}", ending="")
+            self.stdout.flush()
+
+            time.sleep(options["pause"])
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"Powiadomiono {notified} profili. Wciąż do przepakowania: {stale.count()}."
+        )
@@ -0,0 +1,138 @@
+import os
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.cache import bump_task_list_version
+from users.crypto import CRYPTO_VERSION, KDF_ITERATIONS
+from users.models import Task, UserProfile
+
+# Rozkłady zbliżone do danych z produkcji: większość tasków to medium/low,
+# około jednej trzeciej jest zakończona, część nie ma terminu ani opisu
+PRIORITY_WEIGHTS = {"low": 30, "medium": 40, "high": 20, "critical": 10}
+STATUS_WEIGHTS = {"pending": 50, "in_progress": 20, "completed": 30}
+IMPORTANT_RATIO = 0.15
+NO_DEADLINE_RATIO = 0.4
+NO_DESCRIPTION_RATIO = 0.3
+
+WORDS = (
+    "raport klient faktura spotkanie projekt review deploy backup migracja "
+    "test dokumentacja budżet zakupy telefon mail prezentacja plan sprint "
+    "serwer baza kod poprawka ticket umowa oferta szkolenie"
+).split()
+
+
+def random_task(rng, user_id, today):
+    """
+    Task z rozkładami jak wyżej (współdzielone z check_task_plans).
+    """
+    title = " ".join(rng.choices(WORDS, k=rng.randint(1, 6))).capitalize()
+
+    description = ""
+    if rng.random() >= NO_DESCRIPTION_RATIO:
+        # Długi ogon: zwykle kilkadziesiąt znaków, czasem kilka tysięcy
+        length = min(int(rng.lognormvariate(4, 1.2)), 5000)
+        description = " ".join(rng.choices(WORDS, k=max(1, length // 8)))[:length]
+
+    deadline = None
+    if rng.random() >= NO_DEADLINE_RATIO:
+        deadline = today + timedelta(days=rng.randint(-30, 90))
+
+    return Task(
+        user_id=user_id,
+        title=title,
+        description=description,
+        priority=rng.choices(list(PRIORITY_WEIGHTS), weights=PRIORITY_WEIGHTS.values())[0],
+        status=rng.choices(list(STATUS_WEIGHTS), weights=STATUS_WEIGHTS.values())[0],
+        is_important=rng.random() < IMPORTANT_RATIO,
+        deadline=deadline,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Generuje N userów z M taskami każdy (bulk_create, paczkami) do testów "
+        "obciążeniowych. Wszyscy dostają to samo hasło, więc loadtest.py może się "
+        "na nich logować. --seed daje powtarzalne dane."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=200, help="Tasków na usera")
+        parser.add_argument("--prefix", default="seed_", help="Prefiks nazw userów")
+        parser.add_argument("--password", default="Seed-Passw0rd!")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        start = time.perf_counter()
+
+        # Jeden hash dla wszystkich - 600k iteracji PBKDF2 na usera to minuty
+        password = make_password(options["password"])
+        usernames = [f"{prefix}{number:06d}" for number in range(options["users"])]
+
+        with transaction.atomic():
+            User.objects.bulk_create(
+                [
+                    User(username=username, email=f"{username}@example.com", password=password)
+                    for username in usernames
+                ],
+                batch_size=options["batch_size"],
+                ignore_conflicts=True,
+            )
+            user_ids = list(
+                User.objects.filter(username__in=usernames).order_by("username").values_list("id", flat=True)
+            )
+            UserProfile.objects.bulk_create(
+                [
+                    UserProfile(
+                        user_id=user_id,
+                        kdf_salt=os.urandom(16),
+                        kdf_iterations=KDF_ITERATIONS,
+                        crypto_version=CRYPTO_VERSION,
+                    )
+                    for user_id in user_ids
+                ],
+                batch_size=options["batch_size"],
+                ignore_conflicts=True,
+            )
+
+        self.stdout.write(f"{len(user_ids)} userów ({prefix}*), hasło: {options['password']}")
+
+        created = 0
+        today = timezone.localdate()
+        batch = []
+        for user_id in user_ids:
+            for _ in range(options["tasks"]):
+                batch.append(random_task(rng, user_id, today))
+                if len(batch) >= options["batch_size"]:
+                    created += self.flush(batch)
+
+        if batch:
+            created += self.flush(batch)
+
+        # Dopiero po ostatniej paczce - wcześniejszy bump zostawiłby w cache
+        # listę bez tasków usera, które czekały jeszcze w buforze
+        for user_id in user_ids:
+            bump_task_list_version(user_id)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write("")
+        self.stdout.write(f"{created} tasków w {elapsed:.1f} s ({created / elapsed:.0f} wierszy/s)")
+
+    def flush(self, batch):
+        with transaction.atomic():
+            Task.objects.bulk_create(batch)
+        count = len(batch)
+        batch.clear()
+        self.stdout.write(".", ending="")
+        self.stdout.flush()
+        return count
@@ -0,0 +1,272 @@
+import logging
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import redis
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Granice kubełków histogramu latencji (sekundy)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Co ile sekund worker dopisuje swoje liczniki do wspólnego hasha w Redisie
+FLUSH_INTERVAL = 10
+
+METRICS_KEY = "justtodo:metrics"
+
+# Metody HTTP jako etykiety - każda inna to "other", żeby klient wysyłający
+# dowolne metody nie tworzył nowych serii
+METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+# Fazy mierzone przez timed() - kolejność w nagłówku Server-Timing
+PHASES = ("serialize", "render", "crypto")
+
+METRIC_HELP = {
+    "http_requests_total": ("counter", "Requests by view, method and status."),
+    "http_request_duration_seconds": ("histogram", "Time until the view returned a response."),
+    "db_queries_total": ("counter", "SQL queries executed by requests."),
+    "db_query_duration_seconds_total": ("counter", "Time spent in SQL queries."),
+    "request_phase_seconds_total": ("counter", "Time spent in serialization, rendering and crypto."),
+}
+
+# Pomiary bieżącego requestu. Contextvar przechodzi do wątków sync_to_async,
+# więc zapytania z async ORM też trafiają do właściwego requestu.
+_timings = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Dolicza czas bloku do fazy bieżącego requestu (poza requestem nic nie robi).
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """
+    execute_wrapper liczący zapytania i czas SQL. Instalowany na każdym
+    połączeniu przy jego utworzeniu (signals.py), nie per request.
+    """
+    timings = _timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings["db"] = timings.get("db", 0.0) + time.perf_counter() - start
+        timings["queries"] = timings.get("queries", 0) + 1
+
+
+class Registry:
+    """
+    Liczniki procesu aktualizowane w pamięci (bez I/O w requeście).
+    Wątek w tle co FLUSH_INTERVAL dopisuje je jedną transakcją do hasha
+    w Redisie, więc /metrics widzi sumę ze wszystkich workerów Gunicorna.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        # Sumy tego procesu - /metrics pokazuje je, gdy Redis nie odpowiada
+        self.local = {}
+        self.client = None
+        self.flusher_pid = None
+
+    def observe(self, view, method, status, elapsed, timings):
+        """
+        Zapisuje jeden request w pamięci procesu.
+        """
+        view = view.replace("\\", "\\\\").replace('"', '\\"')
+        labels = f'view="{view}",method="{method}"'
+        updates = [
+            (f'http_requests_total{{{labels},status="{status}"}}', 1),
+            (f"http_request_duration_seconds_sum{{{labels}}}", elapsed),
+            (f"http_request_duration_seconds_count{{{labels}}}", 1),
+            (f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}', 1),
+            (f"db_queries_total{{{labels}}}", timings.get("queries", 0)),
+            (f"db_query_duration_seconds_total{{{labels}}}", timings.get("db", 0.0)),
+        ]
+        for le in LATENCY_BUCKETS[bisect_left(LATENCY_BUCKETS, elapsed):]:
+            updates.append((f'http_request_duration_seconds_bucket{{{labels},le="{le}"}}', 1))
+        for phase in PHASES:
+            if phase in timings:
+                updates.append((f'request_phase_seconds_total{{{labels},phase="{phase}"}}', timings[phase]))
+
+        with self.lock:
+            for field, value in updates:
+                self.pending[field] = self.pending.get(field, 0) + value
+                self.local[field] = self.local.get(field, 0) + value
+
+        self.start_flusher()
+
+    def start_flusher(self):
+        # Wątek startuje leniwie w każdym workerze - wątki nie przeżywają forka
+        pid = os.getpid()
+        if self.flusher_pid == pid:
+            return
+        with self.lock:
+            if self.flusher_pid == pid:
+                return
+            self.flusher_pid = pid
+            self.client = None
+        threading.Thread(target=self.run_flusher, name="metrics-flush", daemon=True).start()
+
+    def run_flusher(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            self.flush()
+
+    def redis(self):
+        if self.client is None:
+            self.client = redis.Redis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+            )
+        return self.client
+
+    def flush(self):
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        try:
+            pipe = self.redis().pipeline()
+            for field, value in pending.items():
+                pipe.hincrbyfloat(METRICS_KEY, field, value)
+            pipe.execute()
+        except redis.RedisError:
+            # MULTI/EXEC - nic nie zostało zapisane, oddajemy liczniki na następny raz
+            logger.warning("Could not flush metrics", exc_info=True)
+            with self.lock:
+                for field, value in pending.items():
+                    self.pending[field] = self.pending.get(field, 0) + value
+
+    def collect(self):
+        """
+        Suma ze wszystkich workerów z Redisa. Gdy Redis nie odpowiada -
+        same liczniki tego procesu, zamiast 500 na /metrics.
+        """
+        self.flush()
+        try:
+            return {
+                field.decode(): value.decode()
+                for field, value in self.redis().hgetall(METRICS_KEY).items()
+            }
+        except redis.RedisError:
+            logger.warning("Could not read metrics, rendering local counters", exc_info=True)
+            with self.lock:
+                return {field: str(value) for field, value in self.local.items()}
+
+
+registry = Registry()
+
+
+def _series_order(field):
+    # Kubełki histogramu muszą iść rosnąco po le, a nie alfabetycznie
+    name, _, labels = field.partition("{")
+    labels = labels.rstrip("}")
+    le = math.inf
+    if 'le="' in labels:
+        value = labels.split('le="')[1].split('"')[0]
+        le = math.inf if value == "+Inf" else float(value)
+        labels = labels.split(',le="')[0]
+    return name.rsplit("_", 1)[0] if name.endswith(("_bucket", "_sum", "_count")) else name, labels, le, name
+
+
+def render_metrics():
+    """
+    Wszystkie liczniki w formacie tekstowym Prometheusa.
+    """
+    lines = []
+    family = None
+    for field, value in sorted(registry.collect().items(), key=lambda item: _series_order(item[0])):
+        current = _series_order(field)[0]
+        if current != family:
+            family = current
+            kind, text = METRIC_HELP.get(family, ("untyped", ""))
+            lines.append(f"# HELP {family} {text}")
+            lines.append(f"# TYPE {family} {kind}")
+        lines.append(f"{field} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:.1f}"
+
+
+class MetricsMiddleware:
+    """
+    Mierzy każdy request: liczba i czas zapytań SQL, serializacja,
+    renderowanie, krypto i czas całkowity. Wynik wraca w nagłówku
+    Server-Timing i trafia do liczników /metrics. Koszt w requeście to kilka
+    odczytów contextvar i aktualizacja słownika - do Redisa pisze wątek w tle.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        timings = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        self.finish(request, response, timings, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timings = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timings.reset(token)
+
+        self.finish(request, response, timings, time.perf_counter() - start)
+        return response
+
+    @staticmethod
+    def finish(request, response, timings, elapsed):
+        parts = [f'db;dur={_ms(timings.get("db", 0.0))};desc="{timings.get("queries", 0)} queries"']
+        parts += [f"{phase};dur={_ms(timings[phase])}" for phase in PHASES if phase in timings]
+        parts.append(f"total;dur={_ms(elapsed)}")
+        response["Server-Timing"] = ", ".join(parts)
+
+        # Wzorzec URL, nie ścieżka - stała liczba serii niezależnie od id w URL
+        match = request.resolver_match
+        view = match.route if match else "unmatched"
+        method = request.method if request.method in METHODS else "other"
+        registry.observe(view, method, response.status_code, elapsed, timings)
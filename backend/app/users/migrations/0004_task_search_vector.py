@@ -0,0 +1,71 @@
+# Generated by Django 6.0.2 on 2026-10-18 11:00
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# Konfiguracja "simple": treści są po polsku i angielsku,
+# a Postgres nie ma domyślnie słownika dla polskiego.
+FORWARD_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION users_task_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    """
+    CREATE TRIGGER users_task_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, description, search_vector ON users_task
+    FOR EACH ROW EXECUTE FUNCTION users_task_search_vector_update();
+    """,
+    """
+    UPDATE users_task SET search_vector =
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B');
+    """,
+    "CREATE INDEX users_task_search_gin ON users_task USING gin (search_vector);",
+    "CREATE INDEX users_task_title_trgm ON users_task USING gin (title gin_trgm_ops);",
+    "CREATE INDEX users_task_desc_trgm ON users_task USING gin (description gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS users_task_desc_trgm;",
+    "DROP INDEX IF EXISTS users_task_title_trgm;",
+    "DROP INDEX IF EXISTS users_task_search_gin;",
+    "DROP TRIGGER IF EXISTS users_task_search_vector_trigger ON users_task;",
+    "DROP FUNCTION IF EXISTS users_task_search_vector_update();",
+]
+
+
+def run_postgres_only(statements):
+    def run(apps, schema_editor):
+        # Na SQLite (testy) zostaje zwykłe icontains bez indeksów
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_task_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='task',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(
+            run_postgres_only(FORWARD_SQL),
+            run_postgres_only(REVERSE_SQL),
+        ),
+    ]
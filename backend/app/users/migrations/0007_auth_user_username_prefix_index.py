@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-18 14:00
+
+from django.db import migrations
+
+# Wyszukiwanie po prefiksie w katalogu userów (username__istartswith)
+# generuje UPPER("username"::text) LIKE UPPER(%s) - indeks musi mieć
+# dokładnie to wyrażenie i text_pattern_ops, żeby LIKE 'abc%' go używał.
+FORWARD_SQL = (
+    "CREATE INDEX IF NOT EXISTS users_auth_user_username_prefix "
+    "ON auth_user (UPPER(username::text) text_pattern_ops);"
+)
+REVERSE_SQL = "DROP INDEX IF EXISTS users_auth_user_username_prefix;"
+
+
+def run_postgres_only(statement):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0006_task_updated_at_tasktombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgres_only(FORWARD_SQL),
+            run_postgres_only(REVERSE_SQL),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.2 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_auth_user_username_prefix_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='encryptedobject',
+            index=models.Index(fields=['user', 'object_type', 'updated_at', 'id'], name='encobj_user_type_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:00
+
+from django.db import migrations
+
+# title__icontains / description__icontains na Postgresie to
+# UPPER("users_task"."title"::text) LIKE UPPER('%x%') - indeks trigramowy
+# musi mieć dokładnie to wyrażenie, inaczej gałąź OR wymusza skan wszystkich
+# wierszy usera. Zwykły indeks na title zostaje dla trigram_similar (%).
+FORWARD_SQL = [
+    "DROP INDEX IF EXISTS users_task_desc_trgm;",
+    "CREATE INDEX users_task_title_upper_trgm ON users_task USING gin ((UPPER(title::text)) gin_trgm_ops);",
+    "CREATE INDEX users_task_desc_upper_trgm ON users_task USING gin ((UPPER(description::text)) gin_trgm_ops);",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS users_task_desc_upper_trgm;",
+    "DROP INDEX IF EXISTS users_task_title_upper_trgm;",
+    "CREATE INDEX users_task_desc_trgm ON users_task USING gin (description gin_trgm_ops);",
+]
+
+
+def run_postgres_only(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_encryptedobject_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgres_only(FORWARD_SQL),
+            run_postgres_only(REVERSE_SQL),
+        ),
+    ]
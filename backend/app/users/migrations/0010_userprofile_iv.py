@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_task_search_upper_trgm'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='iv',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 import os
 from django.contrib.auth.models import User
 
@@ -13,6 +14,8 @@ class UserProfile(models.Model):
     # Asymetryka
     public_key = models.BinaryField(null=True, blank=True)
     encrypted_private_key = models.BinaryField(null=True, blank=True)
+    # IV AES-GCM, którym zaszyfrowano encrypted_private_key (12 bajtów)
+    iv = models.BinaryField(null=True, blank=True)
 
     # wersjonowanie
     crypto_version = models.IntegerField(default=1)
@@ -27,6 +30,15 @@ class EncryptedObject(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Przyrostowe pobieranie: WHERE user/object_type, keyset po (updated_at, id)
+            models.Index(
+                fields=["user", "object_type", "updated_at", "id"],
+                name="encobj_user_type_updated_idx",
+            ),
+        ]
+
 class Task(models.Model):
 
     PRIORITY_CHOICES = [
@@ -70,6 +82,62 @@ class Task(models.Model):
 
     created_at = models.DateField(auto_now_add=True)
 
+    # Znacznik ostatniej zmiany - kursor synchronizacji przyrostowej (/tasks/sync/).
+    # Ścieżki omijające save() (update_task, bulk_update) ustawiają go same.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Licznik zmian do optymistycznej współbieżności (ETag / If-Match)
+    version = models.PositiveIntegerField(default=1)
+
+    # tsvector z title (waga A) i description (waga B), utrzymywany przez
+    # trigger w Postgresie (migracja 0004). Indeks GIN i indeksy trigramowe
+    # też są tworzone tylko tam, więc nie ma ich w Meta.indexes.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        # Indeksy pod ścieżki dostępu TaskView:
+        # filtr po userze (+ status / is_important), sortowanie (-created_at, -id).
+        # Lookup (id, user) w put/delete obsługuje klucz główny.
+        indexes = [
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                name="task_user_created_idx",
+            ),
+            models.Index(
+                fields=["user", "status", "-created_at", "-id"],
+                name="task_user_status_created_idx",
+            ),
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                condition=models.Q(is_important=True),
+                name="task_user_important_idx",
+            ),
+            models.Index(
+                fields=["user", "updated_at", "id"],
+                name="task_user_updated_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} ({self.user.username})"
 
+
+
+# Ślad po usuniętym tasku, żeby /tasks/sync/ mógł zgłosić usunięcie.
+# Starsze niż TOMBSTONE_RETENTION są czyszczone (prune_task_tombstones).
+class TaskTombstone(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="task_tombstones"
+    )
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "deleted_at", "id"],
+                name="tombstone_user_deleted_idx",
+            ),
+        ]
@@ -0,0 +1,106 @@
+import base64
+from datetime import date
+
+from django.db.models import Q
+
+# Domyślny i maksymalny rozmiar strony listy tasków
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Zamienia parametr ?limit= na int z zakresu 1..maximum.
+    Rzuca ValueError dla niepoprawnej wartości.
+    """
+    if value in (None, ""):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, maximum)
+
+
+def encode_cursor(created_at, pk):
+    """
+    Kursor to (created_at, id) ostatniego elementu strony,
+    zakodowany w base64 bez paddingu, żeby był bezpieczny w URL.
+    """
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Odwrotność encode_cursor. Rzuca ValueError dla zepsutego kursora.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+    except UnicodeDecodeError as exc:
+        raise ValueError("invalid cursor") from exc
+    return date.fromisoformat(created_at), int(pk)
+
+
+def keyset_after(created_at, pk):
+    """
+    Warunek "wszystko za kursorem" dla sortowania (-created_at, -id).
+    """
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+
+def keyset_slice(queryset, cursor, limit):
+    """
+    Strona zapytania za kursorem. Pobiera limit + 1 wierszy,
+    żeby bez COUNT(*) wiedzieć, czy istnieje następna strona.
+    """
+    if cursor:
+        queryset = queryset.filter(keyset_after(*decode_cursor(cursor)))
+
+    return queryset.order_by("-created_at", "-id")[:limit + 1]
+
+
+def split_page(rows, limit):
+    """
+    Dzieli pobrane wiersze (limit + 1, słowniki z .values()) na (page, next_cursor).
+    """
+    page = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last["created_at"], last["id"])
+
+    return page, next_cursor
+
+
+def next_page_headers(request, next_cursor):
+    """
+    Nagłówki X-Next-Cursor i Link dla następnej strony (pusty dict na końcu listy).
+    """
+    if not next_cursor:
+        return {}
+
+    next_params = request.GET.copy()
+    next_params["cursor"] = next_cursor
+    next_url = request.build_absolute_uri(f"{request.path}?{next_params.urlencode()}")
+
+    return {
+        "X-Next-Cursor": next_cursor,
+        "Link": f'<{next_url}>; rel="next"',
+    }
+
+
+def encode_username_cursor(username):
+    return base64.urlsafe_b64encode(username.encode()).decode().rstrip("=")
+
+
+def decode_username_cursor(cursor):
+    """
+    Rzuca ValueError dla zepsutego kursora.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return base64.urlsafe_b64decode(padded).decode()
+    except UnicodeDecodeError as exc:
+        raise ValueError("invalid cursor") from exc
@@ -0,0 +1,65 @@
+import logging
+import secrets
+import threading
+from functools import partial
+
+from django.core.cache import cache
+from django.db import connection
+
+from .crypto import get_executor, provision_keys
+from .keys import bump_keys_version
+from .models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Pola UserProfile wypełniane przez provision_keys
+PROFILE_KEY_FIELDS = (
+    "kdf_salt", "kdf_iterations", "crypto_version", "public_key", "encrypted_private_key", "iv",
+)
+
+# Jak długo wynik joba czeka w Redisie na odebranie przez klienta
+JOB_TIMEOUT = 3600
+
+
+def _job_key(job_id):
+    return f"register:job:{job_id}"
+
+
+def start_key_provisioning(user_id, password, salt):
+    """
+    Zleca generowanie kluczy puli procesów i od razu zwraca id joba.
+    Używa saltu zapisanego już w profilu. Wynik trafia do profilu
+    i do cache, skąd odczytuje go get_job.
+    """
+    job_id = secrets.token_urlsafe(16)
+    cache.set(_job_key(job_id), {"status": "pending"}, JOB_TIMEOUT)
+
+    future = get_executor().submit(provision_keys, password, salt)
+    future.add_done_callback(
+        partial(_finish_key_provisioning, job_id, user_id, threading.get_ident())
+    )
+    return job_id
+
+
+def _finish_key_provisioning(job_id, user_id, submitter, future):
+    try:
+        keys = future.result()
+        UserProfile.objects.filter(user_id=user_id).update(
+            **{field: keys[field] for field in PROFILE_KEY_FIELDS}
+        )
+        # update() nie wysyła post_save
+        bump_keys_version(user_id)
+    except Exception:
+        logger.exception("Key provisioning failed for user %s", user_id)
+        cache.set(_job_key(job_id), {"status": "failed"}, JOB_TIMEOUT)
+    else:
+        cache.set(_job_key(job_id), {"status": "done", "keys": keys}, JOB_TIMEOUT)
+    finally:
+        # Callback działa w wątku puli - zamykamy jego własne połączenie,
+        # ale nigdy połączenia wątku obsługującego request
+        if threading.get_ident() != submitter:
+            connection.close()
+
+
+def get_job(job_id):
+    return cache.get(_job_key(job_id))
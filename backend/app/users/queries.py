@@ -0,0 +1,228 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+from .pagination import keyset_slice, parse_limit
+from .serializers import TaskSerializer
+
+
+def uses_fulltext(params):
+    """
+    Czy wyszukiwanie idzie przez tsvector + pg_trgm (tylko Postgres).
+    Na SQLite zostaje stare icontains.
+    """
+    return bool(params.get("search")) and connection.vendor == "postgresql"
+
+
+def filter_tasks(user_id, params):
+    """
+    Buduje QuerySet tasków użytkownika na podstawie parametrów
+    z query stringa (status, important, search). Współdzielone przez
+    TaskView i komendy diagnostyczne, żeby sprawdzały te same zapytania.
+    """
+    tasks = Task.objects.filter(user_id=user_id).defer("search_vector")
+
+    # --- filtrowanie po statusie ---
+    status_param = params.get("status")
+    if status_param:
+        tasks = tasks.filter(status=status_param)
+
+    # --- filtrowanie po ważnych ---
+    important_param = params.get("important")
+    if important_param == "true":
+        tasks = tasks.filter(is_important=True)
+
+    # --- wyszukiwanie ---
+    search_param = params.get("search")
+    if search_param and uses_fulltext(params):
+        # Pełnotekstowe po słowach (GIN na search_vector) + trigramy dla
+        # literówek (GIN gin_trgm_ops na title) i podciągów (GIN gin_trgm_ops
+        # na UPPER(title/description) - dokładnie wyrażenie z icontains)
+        query = SearchQuery(search_param, config="simple", search_type="websearch")
+        tasks = tasks.filter(
+            Q(search_vector=query) |
+            Q(title__trigram_similar=search_param) |
+            Q(title__icontains=search_param) |
+            Q(description__icontains=search_param)
+        ).annotate(rank=SearchRank(F("search_vector"), query))
+    elif search_param:
+        tasks = tasks.filter(
+            Q(title__icontains=search_param) |
+            Q(description__icontains=search_param)
+        )
+
+    return tasks
+
+
+def task_list_queryset(user_id, params):
+    """
+    Pełne zapytanie listy tasków z TaskView.get: filtry, projekcja pól
+    (?fields=) i strona (?limit=, ?cursor=). Zwraca (queryset, fields, limit);
+    wiersze trzeba jeszcze podzielić przez split_page. Niepoprawne parametry
+    rzucają ValueError z komunikatem dla klienta.
+    """
+    tasks = filter_tasks(user_id, params)
+
+    # --- projekcja pól (?fields=id,title,status) ---
+    fields = None
+    fields_param = params.get("fields")
+    if fields_param:
+        fields = [f for f in fields_param.split(",") if f]
+        unknown = set(fields) - set(TaskSerializer.Meta.fields)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+        # id i created_at są zawsze potrzebne do kursora
+        tasks = tasks.only("id", "created_at", *fields)
+
+    # --- paginacja kursorowa po (created_at, id) ---
+    try:
+        limit = parse_limit(params.get("limit"))
+        if uses_fulltext(params):
+            # Wyniki wyszukiwania: jedna strona najlepiej dopasowanych
+            tasks = tasks.order_by("-rank", "-created_at", "-id")[:limit]
+        else:
+            tasks = keyset_slice(tasks, params.get("cursor"), limit)
+    except ValueError:
+        raise ValueError("Invalid limit or cursor")
+
+    return tasks, fields, limit
+
+
+def task_list_values(tasks, fields):
+    """
+    Szybka ścieżka odczytu listy: słowniki z .values() zamiast instancji
+    modelu + TaskSerializer. Daty zostają obiektami date - renderer orjson
+    zapisuje je w ISO, tak samo jak DateField z DRF.
+    Zwraca (values_queryset, columns); id i created_at są pobierane zawsze
+    (kursor), a project_rows usuwa je, jeśli klient ich nie chciał.
+    """
+    columns = list(fields or TaskSerializer.Meta.fields)
+    return tasks.values(*dict.fromkeys([*columns, "id", "created_at"])), columns
+
+
+def project_rows(rows, columns):
+    extra = {"id", "created_at"} - set(columns)
+    if extra:
+        for row in rows:
+            for name in extra:
+                del row[name]
+    return rows
+
+
+# Kolumny zwracane przez UPDATE ... RETURNING (to, co pokazuje TaskSerializer)
+RETURNING_FIELDS = ["id", *[name for name in TaskSerializer.Meta.fields if name != "id"]]
+
+
+def task_etag(task):
+    return f'"{task.id}-{task.version}"'
+
+
+def parse_if_match(request, task_id):
+    """
+    Oczekiwana wersja taska z nagłówka If-Match (ETag z task_etag).
+    None gdy nagłówka brak; ValueError gdy ETag jest zepsuty
+    albo dotyczy innego taska.
+    """
+    header = request.headers.get("If-Match")
+    if not header:
+        return None
+
+    etag_id, version = header.strip().removeprefix("W/").strip('"').split("-")
+    if int(etag_id) != int(task_id):
+        raise ValueError("ETag does not match this task")
+    return int(version)
+
+
+def update_task(task_id, user_id, changes, expected_version=None):
+    """
+    Jedno UPDATE ... WHERE id AND user_id [AND version] RETURNING ...,
+    zapisujące tylko zmienione kolumny i podbijające version.
+    Zwraca zaktualizowany Task albo None, gdy żaden wiersz nie pasował.
+    """
+    quote = connection.ops.quote_name
+    assignments = []
+    params = []
+
+    # UPDATE omija auto_now, więc updated_at ustawiamy sami
+    if changes:
+        changes = {**changes, "updated_at": timezone.now()}
+
+    for name, value in changes.items():
+        field = Task._meta.get_field(name)
+        assignments.append(f"{quote(field.column)} = %s")
+        params.append(field.get_db_prep_save(value, connection))
+
+    # Pusta zmiana nie podbija wersji
+    assignments.append(f"{quote('version')} = {quote('version')}{' + 1' if changes else ''}")
+
+    where = f"{quote('id')} = %s AND {quote('user_id')} = %s"
+    params += [task_id, user_id]
+    if expected_version is not None:
+        where += f" AND {quote('version')} = %s"
+        params.append(expected_version)
+
+    returning = ", ".join(quote(Task._meta.get_field(name).column) for name in RETURNING_FIELDS)
+    sql = (
+        f"UPDATE {quote(Task._meta.db_table)} SET {', '.join(assignments)} "
+        f"WHERE {where} RETURNING {returning}"
+    )
+
+    # raw() stosuje konwertery backendu i buduje instancję z RETURNING
+    rows = list(Task.objects.raw(sql, params))
+    return rows[0] if rows else None
+
+
+def delete_task(task_id, user_id, expected_version=None):
+    """
+    Jedno DELETE ... WHERE (Task nie ma zależnych obiektów ani sygnałów,
+    więc Collector robi szybkie usuwanie bez SELECT-a) plus tombstone
+    dla /tasks/sync/ w tej samej transakcji. Zwraca liczbę usuniętych wierszy.
+    """
+    tasks = Task.objects.filter(id=task_id, user_id=user_id)
+    if expected_version is not None:
+        tasks = tasks.filter(version=expected_version)
+
+    with transaction.atomic():
+        deleted, _ = tasks.delete()
+        if deleted:
+            TaskTombstone.objects.create(user_id=user_id, task_id=task_id)
+    return deleted
+
+
+def precondition_failed(task_id, user_id, expected_version):
+    """
+    Po 0 zmienionych wierszy: czy to konflikt wersji (412), czy brak taska (404).
+    Wykonywane tylko na ścieżce błędu.
+    """
+    return expected_version is not None and Task.objects.filter(id=task_id, user_id=user_id).exists()
+
+
+def task_stats(user_id):
+    """
+    Liczniki dla dashboardu jednym zapytaniem (COUNT(*) FILTER (WHERE ...)).
+    Przeterminowany = deadline w przeszłości i status inny niż completed.
+    """
+    counts = {
+        "total": Count("id"),
+        "important": Count("id", filter=Q(is_important=True)),
+        "overdue": Count(
+            "id",
+            filter=Q(deadline__lt=timezone.localdate()) & ~Q(status="completed"),
+        ),
+    }
+    for value, _ in Task.STATUS_CHOICES:
+        counts[f"status_{value}"] = Count("id", filter=Q(status=value))
+    for value, _ in Task.PRIORITY_CHOICES:
+        counts[f"priority_{value}"] = Count("id", filter=Q(priority=value))
+
+    row = Task.objects.filter(user_id=user_id).aggregate(**counts)
+
+    return {
+        "total": row["total"],
+        "important": row["important"],
+        "overdue": row["overdue"],
+        "by_status": {value: row[f"status_{value}"] for value, _ in Task.STATUS_CHOICES},
+        "by_priority": {value: row[f"priority_{value}"] for value, _ in Task.PRIORITY_CHOICES},
+    }
@@ -0,0 +1,22 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .metrics import timed
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer z orjson zamiast stdlib json - kilka razy szybszy na dużych
+    listach. Typy, których orjson nie zna (Decimal, lazy stringi itp.),
+    obsługuje encoder DRF.
+    """
+
+    _fallback = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        with timed("render"):
+            # Błędy ListSerializer (np. /tasks/batch/) mają klucze int - indeksy elementów
+            return orjson.dumps(data, default=self._fallback.default, option=orjson.OPT_NON_STR_KEYS)
@@ -1,6 +1,9 @@
 from django.contrib.auth.models import User
-from rest_framework import serializers
-from django.contrib.auth import authenticate
+from rest_framework import exceptions, serializers
+from django.db import transaction
+from .authentication import LoginBusy, verify_credentials
+from .crypto import CRYPTO_VERSION, KDF_ITERATIONS
+from .metrics import timed
 from .models import UserProfile, Task
 import base64
 import os
@@ -13,51 +16,103 @@ class RegisterSerializer(serializers.ModelSerializer):
         fields = ('username', 'email', 'password')
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password']
-        )
+        # Pola profilu przychodzą z widoku przez serializer.save(profile=...),
+        # żeby user i w pełni wypełniony profil powstały w jednej transakcji
+        profile_data = validated_data.pop('profile', None) or {
+            'kdf_salt': os.urandom(16),
+            'kdf_iterations': KDF_ITERATIONS,
+            'crypto_version': CRYPTO_VERSION,
+        }
 
-        salt = os.urandom(16)
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=validated_data['username'],
+                email=validated_data['email'],
+                password=validated_data['password']
+            )
 
-        UserProfile.objects.create(
-            user=user,
-            kdf_salt=salt,
-            kdf_iterations=600000
-        )
+            UserProfile.objects.create(user=user, **profile_data)
 
         return user
     
 def safe_b64encode(value):
     if value is None:
         return None
-    # jeśli value jest memoryview, zamień na bytes
-    if isinstance(value, memoryview):
-        value = bytes(value)
-    elif not isinstance(value, (bytes, bytearray)):
+    # b64encode przyjmuje memoryview wprost - bez kopii do bytes
+    if not isinstance(value, (bytes, bytearray, memoryview)):
         raise TypeError(f"Expected bytes, got {type(value)}")
     return base64.b64encode(value).decode()
 
+def encode_key_bundle(keys):
+    """
+    Materiał z provision_keys w formie odpowiedzi API (base64).
+    """
+    return {
+        "kdf_salt": safe_b64encode(keys["kdf_salt"]),
+        "kdf_iterations": keys["kdf_iterations"],
+        "public_key": safe_b64encode(keys["public_key"]),
+        "encrypted_private_key": safe_b64encode(keys["encrypted_private_key"]),
+        "iv": safe_b64encode(keys["iv"]),  # frontend potrzebuje IV do odszyfrowania
+    }
+
+class Base64Field(serializers.CharField):
+    def to_internal_value(self, data):
+        try:
+            return base64.b64decode(super().to_internal_value(data), validate=True)
+        except ValueError:
+            raise serializers.ValidationError("Invalid base64.")
+
+class KeyBundleSerializer(serializers.Serializer):
+    """
+    Klucz prywatny opakowany ponownie przez klienta (nowy salt / iteracje / IV).
+    Klucz publiczny się nie zmienia, więc udostępnienia działają dalej.
+    """
+    kdf_salt = Base64Field()
+    kdf_iterations = serializers.IntegerField(min_value=KDF_ITERATIONS)
+    crypto_version = serializers.IntegerField(min_value=CRYPTO_VERSION, max_value=CRYPTO_VERSION)
+    encrypted_private_key = Base64Field()
+    iv = Base64Field()
+
+    def validate_kdf_salt(self, value):
+        if len(value) < 16:
+            raise serializers.ValidationError("Salt must be at least 16 bytes.")
+        return value
+
+    def validate_iv(self, value):
+        # AES-GCM z 96-bitowym nonce, jak w provision_keys
+        if len(value) != 12:
+            raise serializers.ValidationError("IV must be 12 bytes.")
+        return value
+
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
 
     def validate(self, data):
-        user = authenticate(
-            username=data['username'],
-            password=data['password']
-        )
+        try:
+            user = verify_credentials(
+                data['username'], data['password'], request=self.context.get('request')
+            )
+        except LoginBusy:
+            raise exceptions.Throttled(wait=1, detail="Zbyt wiele prób logowania, spróbuj ponownie.")
         if not user:
             raise serializers.ValidationError("Nieprawidłowe dane logowania.")
         # Zwracamy użytkownika w validated_data do dalszego użycia
         data['user'] = user
         return data
 
+class TimedListSerializer(serializers.ListSerializer):
+    # Czas serializacji listy w Server-Timing / metrykach
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
 class TaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
+        list_serializer_class = TimedListSerializer
         fields = [
             "id",
             "title",
@@ -67,10 +122,11 @@ class TaskSerializer(serializers.ModelSerializer):
             "is_important",
             "deadline",
             "created_at",
+            "version",
         ]
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "created_at", "version"]
 
-class UserSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = User
-        fields = ['id', 'username', 'email']
\ No newline at end of file
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import forget_user_active
+from .keys import bump_keys_version
+from .metrics import db_wrapper
+from .models import UserProfile
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def reset_user_active_cache(sender, instance, **kwargs):
+    # StatelessJWTAuthentication od razu zobaczy dezaktywację / usunięcie
+    forget_user_active(instance.id)
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def reset_key_cache(sender, instance, **kwargs):
+    # Nowy pakiet kluczy / klucz publiczny przy następnym odczycie
+    bump_keys_version(instance.user_id)
+
+
+@receiver(connection_created)
+def install_db_wrapper(sender, connection, **kwargs):
+    # Liczenie zapytań i czasu SQL dla Server-Timing / metryk. Ten sam
+    # DatabaseWrapper może łączyć się wielokrotnie - instalujemy raz.
+    if db_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_wrapper)
@@ -0,0 +1,37 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+# Ile kawałków odpowiedzi pobiera jedno przejście do wątku sync
+ASYNC_CHUNKS = 100
+
+
+async def _aiterate(iterator):
+    """
+    Async iterator nad synchronicznym: kolejne paczki kawałków pobierane
+    w wątku sync (thread_sensitive - zawsze ten sam wątek, więc
+    server-side cursor zostaje na swoim połączeniu z bazą).
+    """
+    next_chunks = sync_to_async(lambda: list(islice(iterator, ASYNC_CHUNKS)))
+    try:
+        while chunks := await next_chunks():
+            for chunk in chunks:
+                yield chunk
+    finally:
+        # Zerwane połączenie - zamykamy generator (i kursor) w tym samym wątku
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_content(request, iterator):
+    """
+    Treść dla StreamingHttpResponse. Pod ASGI Django najpierw zbiera cały
+    synchroniczny iterator do pamięci, więc dostaje wtedy async iterator;
+    pod WSGI iterator idzie bez zmian.
+    """
+    # Request DRF opakowuje HttpRequest
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        return _aiterate(iter(iterator))
+    return iterator
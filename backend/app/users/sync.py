@@ -0,0 +1,118 @@
+import base64
+import json
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task, TaskTombstone
+
+# Tombstony starsze niż to są usuwane (prune_task_tombstones);
+# kursor sprzed tej granicy wymaga pełnej synchronizacji (410)
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# updated_at / deleted_at nadaje zegar aplikacji przy zapisie, a nie commit -
+# transakcja zatwierdzona później może mieć znacznik sprzed kursora. Dlatego
+# kursor obu strumieni nie wychodzi poza now - SYNC_LAG: ostatnia minuta
+# przychodzi ponownie przy kolejnej synchronizacji (klient robi upsert po id)
+SYNC_LAG = timedelta(minutes=1)
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class CursorExpired(Exception):
+    pass
+
+
+def encode_sync_cursor(tasks_position, tombstones_position):
+    """
+    Kursor to pozycje (znacznik czasu, id) w dwóch strumieniach:
+    zmienionych tasków i tombstonów.
+    """
+    raw = json.dumps({
+        "t": [tasks_position[0].isoformat(), tasks_position[1]],
+        "d": [tombstones_position[0].isoformat(), tombstones_position[1]],
+    })
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor):
+    """
+    Odwrotność encode_sync_cursor. Rzuca ValueError dla zepsutego kursora.
+    """
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        positions = tuple(
+            (datetime.fromisoformat(data[key][0]), int(data[key][1]))
+            for key in ("t", "d")
+        )
+    except (KeyError, IndexError, TypeError, UnicodeDecodeError) as exc:
+        raise ValueError("invalid cursor") from exc
+
+    if any(moment.tzinfo is None for moment, _ in positions):
+        raise ValueError("invalid cursor")
+    return positions
+
+
+def _after(field, position):
+    moment, pk = position
+    return Q(**{f"{field}__gt": moment}) | Q(**{field: moment, "id__gt": pk})
+
+
+def _next_position(position, rows, limit, horizon):
+    """
+    Pozycja kursora strumienia po tej stronie wyników (rows to pary
+    (znacznik, id) z limit + 1 wierszy). Pełna strona przesuwa się do
+    ostatniego wiersza, żeby stronicowanie zawsze szło naprzód; ostatnia
+    strona zatrzymuje się na horyzoncie, więc okno SYNC_LAG jest czytane ponownie.
+    """
+    if len(rows) > limit:
+        return rows[limit - 1]
+    if rows:
+        return max(position, min(rows[-1], horizon))
+    return max(position, horizon)
+
+
+def changes_since(user_id, cursor, limit):
+    """
+    Taski zmienione i usunięte od kursora, najwyżej limit z każdego strumienia.
+    Bez kursora: wszystkie taski, a usunięcia liczone od now - SYNC_LAG.
+    Zmiany z ostatnich SYNC_LAG mogą przyjść ponownie w kolejnej odpowiedzi.
+    Zwraca (changed, deleted_task_ids, next_cursor, has_more).
+    """
+    now = timezone.now()
+    horizon = (now - SYNC_LAG, 0)
+
+    if cursor:
+        tasks_position, tombstones_position = decode_sync_cursor(cursor)
+        if tombstones_position[0] < now - TOMBSTONE_RETENTION:
+            raise CursorExpired()
+    else:
+        tasks_position, tombstones_position = (EPOCH, 0), horizon
+
+    changed = list(
+        Task.objects.filter(user_id=user_id)
+        .filter(_after("updated_at", tasks_position))
+        .defer("search_vector")
+        .order_by("updated_at", "id")[:limit + 1]
+    )
+    tombstones = list(
+        TaskTombstone.objects.filter(user_id=user_id)
+        .filter(_after("deleted_at", tombstones_position))
+        .order_by("deleted_at", "id")
+        .values_list("deleted_at", "id", "task_id")[:limit + 1]
+    )
+
+    has_more = len(changed) > limit or len(tombstones) > limit
+
+    # Brak usunięć też przesuwa pozycję, żeby kursor nie "wygasł" sam z siebie
+    tasks_position = _next_position(
+        tasks_position, [(task.updated_at, task.id) for task in changed], limit, horizon
+    )
+    tombstones_position = _next_position(
+        tombstones_position, [row[:2] for row in tombstones], limit, horizon
+    )
+
+    next_cursor = encode_sync_cursor(tasks_position, tombstones_position)
+    return changed[:limit], [task_id for _, _, task_id in tombstones[:limit]], next_cursor, has_more
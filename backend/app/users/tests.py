@@ -1,3 +1,275 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
-# Create your tests here.
+from .metrics import registry
+from .models import EncryptedObject, Task, UserProfile
+
+# Testy bez Redisa: cache w pamięci i broker zdarzeń w procesie
+TEST_SETTINGS = {
+    "CACHES": {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    "TASK_EVENTS_BACKEND": "memory",
+}
+
+
+def auth_client(user):
+    # Token jak z /api/login/ - StatelessJWTAuthentication czyta username z claimów
+    refresh = RefreshToken.for_user(user)
+    refresh["username"] = user.username
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+    return client
+
+
+@override_settings(**TEST_SETTINGS)
+class APITestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="Passw0rd!")
+        self.client = auth_client(self.user)
+
+
+class TaskBatchValidationTests(APITestCase):
+    url = "/api/tasks/batch/"
+
+    def test_invalid_create_returns_per_item_errors(self):
+        response = self.client.post(
+            self.url, {"create": [{"title": "ok"}, {"title": ""}]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("create", response.json())
+
+    def test_invalid_update_returns_per_item_errors(self):
+        response = self.client.post(
+            self.url, {"update": [{"id": 1, "priority": "urgent"}]}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("update", response.json())
+
+    def test_non_object_item_returns_400(self):
+        response = self.client.post(self.url, {"create": ["title"]}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_duplicate_ids_across_update_and_delete_are_rejected(self):
+        task = Task.objects.create(user=self.user, title="a")
+
+        for body in (
+            {"delete": [task.id, task.id]},
+            {"update": [{"id": task.id, "title": "b"}], "delete": [task.id]},
+            {"update": [{"id": task.id}, {"id": task.id}]},
+        ):
+            with self.subTest(body=body):
+                response = self.client.post(self.url, body, format="json")
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("ids", response.json())
+
+        self.assertTrue(Task.objects.filter(id=task.id).exists())
+
+    def test_valid_batch_is_applied(self):
+        kept, removed = (Task.objects.create(user=self.user, title=title) for title in ("kept", "removed"))
+
+        response = self.client.post(self.url, {
+            "create": [{"title": "new"}],
+            "update": [{"id": kept.id, "status": "completed"}],
+            "delete": [removed.id],
+        }, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(Task.objects.filter(user=self.user).values_list("title", "status")),
+            [("kept", "completed"), ("new", "pending")],
+        )
+
+
+class TaskListPagingTests(APITestCase):
+    url = "/api/tasks/"
+
+    def test_keyset_pages_cover_every_task_once_in_order(self):
+        ids = [Task.objects.create(user=self.user, title=f"t{number}").id for number in range(7)]
+        Task.objects.create(user=User.objects.create_user("bob"), title="foreign")
+
+        seen, url = [], f"{self.url}?limit=3"
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            page = response.json()
+            self.assertLessEqual(len(page), 3)
+            seen += [task["id"] for task in page]
+            cursor = response.get("X-Next-Cursor")
+            url = f"{self.url}?limit=3&cursor={cursor}" if cursor else None
+
+        # Najnowsze pierwsze - created_at rośnie razem z id
+        self.assertEqual(seen, ids[::-1])
+
+    def test_invalid_cursor_and_limit_are_400(self):
+        for query in ("cursor=%%%", "limit=0", "limit=abc"):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"{self.url}?{query}").status_code, 400)
+
+
+class TaskIfMatchTests(APITestCase):
+    url = "/api/tasks/"
+
+    def setUp(self):
+        super().setUp()
+        response = self.client.post(self.url, {"title": "draft"}, format="json")
+        self.task_id = response.json()["id"]
+        self.etag = response["ETag"]
+
+    def test_update_with_current_etag_succeeds_and_returns_new_etag(self):
+        response = self.client.put(
+            f"{self.url}?id={self.task_id}", {"title": "final"}, format="json", HTTP_IF_MATCH=self.etag
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], self.etag)
+
+    def test_stale_etag_is_412_for_update_and_delete(self):
+        self.client.put(f"{self.url}?id={self.task_id}", {"title": "v2"}, format="json")
+
+        update = self.client.put(
+            f"{self.url}?id={self.task_id}", {"title": "lost"}, format="json", HTTP_IF_MATCH=self.etag
+        )
+        delete = self.client.delete(f"{self.url}?id={self.task_id}", HTTP_IF_MATCH=self.etag)
+
+        self.assertEqual(update.status_code, 412)
+        self.assertEqual(delete.status_code, 412)
+        self.assertEqual(Task.objects.get(id=self.task_id).title, "v2")
+
+    def test_etag_of_another_task_is_400(self):
+        response = self.client.put(
+            f"{self.url}?id={self.task_id}", {"title": "x"}, format="json", HTTP_IF_MATCH='"999999-1"'
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class TaskImportTests(APITestCase):
+    url = "/api/tasks/import/"
+
+    def post_body(self, body, import_type="ndjson"):
+        return self.client.generic(
+            "POST", f"{self.url}?type={import_type}", body, content_type="application/octet-stream"
+        )
+
+    def list_etag(self):
+        return self.client.get("/api/tasks/")["ETag"]
+
+    def test_invalid_rows_are_reported_and_valid_ones_imported(self):
+        body = b"\n".join([
+            b'{"title": "ok"}',
+            b'{"title": 5}',
+            b'{"title": "x", "priority": ["high"]}',
+            b'{"title": "x", "description": {"a": 1}}',
+            b'{"title": "nul\\u0000"}',
+            b"not json",
+        ])
+
+        response = self.post_body(body)
+
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual(report["created"], 1)
+        self.assertEqual([error["row"] for error in report["errors"]], [2, 3, 4, 5, 6])
+        self.assertEqual(report["errors"][3]["errors"], {"title": "Null characters are not allowed."})
+
+    def test_bad_encoding_keeps_saved_rows_and_bumps_list_version(self):
+        etag = self.list_etag()
+        body = b'{"title": "one"}\n{"title": "two"}\n\xff\xfe\n{"title": "three"}\n'
+
+        response = self.post_body(body)
+
+        self.assertEqual(response.status_code, 400)
+        report = response.json()
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(report["aborted"]["after_row"], 2)
+        self.assertEqual(self.user.tasks.count(), 2)
+        self.assertNotEqual(self.list_etag(), etag)
+
+    def test_malformed_csv_is_a_400_with_partial_report(self):
+        body = b'title,priority\nfirst,high\n"unterminated' + b"x" * 200_000 + b"\n"
+
+        response = self.post_body(body, "csv")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["created"], 1)
+        self.assertIn("Malformed CSV", response.json()["aborted"]["error"])
+
+
+class EncryptedObjectDeleteTests(APITestCase):
+    url = "/api/objects/task/"
+
+    def setUp(self):
+        super().setUp()
+        self.objects = [
+            EncryptedObject.objects.create(user=self.user, object_type="task", ciphertext=b"x")
+            for _ in range(3)
+        ]
+
+    def test_rejects_ids_that_are_not_a_list_of_integers(self):
+        for ids in ["123", 5, [1, "2"], [True], [1.0], None]:
+            with self.subTest(ids=ids):
+                response = self.client.delete(self.url, {"ids": ids}, format="json")
+                self.assertEqual(response.status_code, 400)
+
+        self.assertEqual(EncryptedObject.objects.filter(user=self.user).count(), 3)
+
+    def test_deletes_only_listed_objects(self):
+        response = self.client.delete(self.url, {"ids": [self.objects[0].id]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"deleted": 1})
+        self.assertEqual(EncryptedObject.objects.filter(user=self.user).count(), 2)
+
+
+class KeyBundleTests(APITestCase):
+    url = "/api/keys/"
+
+    def test_bundle_without_keys_is_not_cached(self):
+        # Stan w trakcie rejestracji odroczonej: salt jest, kluczy jeszcze nie
+        UserProfile.objects.create(user=self.user, kdf_salt=b"s" * 16)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["encrypted_private_key"])
+        self.assertIn("no-store", response["Cache-Control"])
+        self.assertNotIn("max-age", response["Cache-Control"])
+
+    def test_complete_bundle_is_cached_privately(self):
+        UserProfile.objects.create(
+            user=self.user,
+            kdf_salt=b"s" * 16,
+            public_key=b"p" * 32,
+            encrypted_private_key=b"k" * 48,
+            iv=b"i" * 12,
+        )
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age", response["Cache-Control"])
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code, 304)
+
+
+@override_settings(**TEST_SETTINGS)
+class MetricsTests(TestCase):
+    def test_metrics_require_token_unless_public(self):
+        with self.settings(METRICS_TOKEN="", METRICS_PUBLIC=False):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+
+        with self.settings(METRICS_TOKEN="secret", METRICS_PUBLIC=False):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            self.assertEqual(
+                self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code, 403
+            )
+
+    def test_unknown_methods_share_one_label(self):
+        self.client.generic("BREW", "/api/tasks/")
+
+        self.assertTrue(any('method="other"' in field for field in registry.local))
+        self.assertFalse(any('method="BREW"' in field for field in registry.local))
@@ -1,12 +1,24 @@
-from django.urls import path
-from .views import RegisterView, LoginView, MeView, RefreshTokenView, TaskView, FetchAllUsers
+from django.urls import path, re_path
+from .async_views import AsyncTaskView, TaskEventsView
+from .views import EncryptedObjectView, KeyBundleView, PublicKeysView, RegisterView, RegisterStatusView, LoginView, MeView, RefreshTokenView, TaskView, TaskBatchView, TaskExportView, TaskImportView, TaskStatsView, TaskSyncView, UserDirectoryView
 
 urlpatterns = [
     path('register/', RegisterView.as_view()),
+    path('register/status/<str:job_id>/', RegisterStatusView.as_view()),
     path('login/', LoginView.as_view()),
     path('refresh/', RefreshTokenView.as_view()),
     path('me/', MeView.as_view()),
-    #path('objects/<str:object_type>/', EncryptedObjectView.as_view()),
+    path('keys/', KeyBundleView.as_view()),
+    path('keys/public/', PublicKeysView.as_view()),
+    # object_type mieści się w EncryptedObject.object_type (max_length=32)
+    re_path(r"^objects/(?P<object_type>[\w-]{1,32})/$", EncryptedObjectView.as_view()),
     path("tasks/", TaskView.as_view()),
-    path("allusers/", FetchAllUsers.as_view()),
+    path("tasks/async/", AsyncTaskView.as_view()),
+    path("tasks/batch/", TaskBatchView.as_view()),
+    path("tasks/sync/", TaskSyncView.as_view()),
+    path("tasks/stats/", TaskStatsView.as_view()),
+    path("tasks/export/", TaskExportView.as_view()),
+    path("tasks/import/", TaskImportView.as_view()),
+    path("tasks/events/", TaskEventsView.as_view()),
+    path("allusers/", UserDirectoryView.as_view()),
 ]
\ No newline at end of file
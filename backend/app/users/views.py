@@ -1,105 +1,158 @@
-import base64
 import os
 from datetime import datetime, timezone 
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.crypto import constant_time_compare
 
 from rest_framework import generics, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.asymmetric import x25519
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.primitives.serialization import (
-    Encoding,
-    NoEncryption,
-    PrivateFormat,
-    PublicFormat,
+from .authentication import StatelessJWTAuthentication
+from .cache import (
+    TASK_LIST_TIMEOUT,
+    bump_task_list_version,
+    etag_matches,
+    get_task_list_version,
+    task_list_cache_key,
+    task_list_etag,
+    task_stats_cache_key,
 )
-
-from .models import Task, UserProfile
-from .serializers import LoginSerializer, RegisterSerializer, TaskSerializer, safe_b64encode, UserSerializer
+from .crypto import CRYPTO_VERSION, KDF_ITERATIONS, provision_keys
+from .encrypted import (
+    CONTENT_TYPE as ENCRYPTED_CONTENT_TYPE,
+    MAX_BATCH_SIZE as MAX_OBJECT_BATCH_SIZE,
+    iter_frames,
+    objects_since,
+    read_frames,
+    save_objects,
+)
+from .events import publish_task_event
+from .export import CONTENT_TYPES, EXPORTERS, export_rows
+from .importing import PARSERS, import_tasks
+from .keys import (
+    BUNDLE_MAX_AGE,
+    MAX_PUBLIC_KEYS,
+    PUBLIC_KEYS_MAX_AGE,
+    get_key_bundle,
+    get_public_keys,
+    replace_key_bundle,
+)
+from .metrics import render_metrics, timed
+from .models import EncryptedObject, Task, TaskTombstone, UserProfile
+from .pagination import (
+    decode_username_cursor,
+    encode_username_cursor,
+    next_page_headers,
+    parse_limit,
+    split_page,
+)
+from .provisioning import PROFILE_KEY_FIELDS, get_job, start_key_provisioning
+from .queries import (
+    delete_task,
+    parse_if_match,
+    precondition_failed,
+    project_rows,
+    task_etag,
+    task_list_queryset,
+    task_list_values,
+    task_stats,
+    update_task,
+)
+from .serializers import (
+    KeyBundleSerializer,
+    LoginSerializer,
+    RegisterSerializer,
+    TaskSerializer,
+    encode_key_bundle,
+)
+from .streaming import streaming_content
+from .sync import CursorExpired, changes_since
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
 
     def create(self, request, *args, **kwargs):
-        # Utworzenie użytkownika
-        response = super().create(request, *args, **kwargs)
-        user = User.objects.get(username=request.data["username"])
-        profile = user.userprofile
-
-        password = request.data["password"]
-
-        # 1️⃣ Salt do KDF
-        salt = os.urandom(16)
-        profile.kdf_salt = salt
-        profile.kdf_iterations = 600_000  # możesz zmienić
-
-        # 2️⃣ Wyprowadzenie klucza AES z hasła
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=profile.kdf_iterations,
-        )
-        derived_key = kdf.derive(password.encode())  # 32b AES key
-        aesgcm = AESGCM(derived_key)
-        iv = os.urandom(12)
-
-        # 3️⃣ Generacja kluczy ECDH X25519
-        private_key = x25519.X25519PrivateKey.generate()
-        public_key = private_key.public_key()
-
-        # Eksport kluczy w formacie bytes
-        private_bytes = private_key.private_bytes(
-            encoding=Encoding.Raw,
-            format=PrivateFormat.Raw,
-            encryption_algorithm=NoEncryption()
-        )
-        public_bytes = public_key.public_bytes(
-            encoding=Encoding.Raw,
-            format=PublicFormat.Raw
-        )
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
 
-        # 4️⃣ Szyfrowanie private key AES-GCM
-        encrypted_private_key = aesgcm.encrypt(iv, private_bytes, None)
+        password = serializer.validated_data["password"]
+
+        # Tryb odroczony (Prefer: respond-async): PBKDF2 + X25519 lecą do
+        # puli procesów, a klient odpytuje endpoint statusu
+        if "respond-async" in request.headers.get("Prefer", ""):
+            salt = os.urandom(16)
+            user = serializer.save(profile={
+                "kdf_salt": salt,
+                "kdf_iterations": KDF_ITERATIONS,
+                "crypto_version": CRYPTO_VERSION,
+            })
+            job_id = start_key_provisioning(user.id, password, salt)
+            status_url = request.build_absolute_uri(f"status/{job_id}/")
+            return Response(
+                {"message": "User created", "job": job_id, "status_url": status_url},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": status_url},
+            )
 
-        # 5️⃣ Zapis w profilu
-        profile.public_key = public_bytes
-        profile.encrypted_private_key = encrypted_private_key
-        profile.save()
+        # Krypto przed transakcją, żeby nie trzymać jej otwartej przez PBKDF2;
+        # user i kompletny profil to potem jeden INSERT każdy, bez ponownego odczytu
+        with timed("crypto"):
+            keys = provision_keys(password)
+        serializer.save(profile={field: keys[field] for field in PROFILE_KEY_FIELDS})
 
         return Response({
             "message": "User created",
-            "kdf_salt": base64.b64encode(profile.kdf_salt).decode(),
-            "kdf_iterations": profile.kdf_iterations,
-            "public_key": base64.b64encode(profile.public_key).decode(),
-            "encrypted_private_key": base64.b64encode(profile.encrypted_private_key).decode(),
-            "iv": base64.b64encode(iv).decode()  # frontend potrzebuje IV do odszyfrowania
+            **encode_key_bundle(keys),
         }, status=status.HTTP_201_CREATED)
 
+class RegisterStatusView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, job_id):
+        job = get_job(job_id)
+
+        if job is None:
+            return Response({"error": "Job not found"}, status=404)
+
+        if job["status"] == "pending":
+            return Response({"status": "pending"}, status=status.HTTP_202_ACCEPTED)
+
+        if job["status"] == "failed":
+            return Response(
+                {"status": "failed"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+        return Response({
+            "status": "done",
+            **encode_key_bundle(job["keys"]),
+        })
+
 class LoginView(APIView):
     permission_classes = [AllowAny]
 
     def post(self, request):
-        serializer = LoginSerializer(data=request.data)
+        serializer = LoginSerializer(data=request.data, context={"request": request})
         serializer.is_valid(raise_exception=True)
 
         user = serializer.validated_data['user']
-        profile = user.userprofile
 
-        # Generujemy JWT
-        token = AccessToken.for_user(user)
+        # Generujemy JWT - access token z refresh tokena, jak w /refresh/.
+        # username w claimach dla StatelessJWTAuthentication
+        # (access token kopiuje go z refresh tokena)
         refresh = RefreshToken.for_user(user)
+        refresh["username"] = user.username
+        token = refresh.access_token
 
         now = datetime.now(timezone.utc)
         issue_at_ts = int(now.timestamp() * 1000)
@@ -164,119 +217,217 @@ class MeView(APIView):
             "email": request.user.email
         })
 
-# class EncryptedObjectView(APIView):
-#     permission_classes = [IsAuthenticated]
-
-#     def get(self, request, object_type):
-#         """
-#         Zwraca wszystkie zaszyfrowane obiekty danego typu
-#         """
-#         objects = EncryptedObject.objects.filter(
-#             user=request.user,
-#             object_type=object_type
-#         )
-
-#         return Response([
-#             {
-#                 "id": obj.id,
-#                 "ciphertext": base64.b64encode(obj.ciphertext).decode(),
-#                 "created_at": obj.created_at,
-#                 "updated_at": obj.updated_at
-#             }
-#             for obj in objects
-#         ])
-
-#     def post(self, request, object_type):
-#         """
-#         Tworzy nowy zaszyfrowany obiekt
-#         """
-#         ciphertext_b64 = request.data.get("ciphertext")
-#         if not ciphertext_b64:
-#             return Response({"error": "ciphertext required"}, status=400)
-
-#         ciphertext = base64.b64decode(ciphertext_b64)
-
-#         obj = EncryptedObject.objects.create(
-#             user=request.user,
-#             object_type=object_type,
-#             ciphertext=ciphertext
-#         )
-
-#         return Response({"id": obj.id}, status=status.HTTP_201_CREATED)
-
-#     def put(self, request, object_type):
-#         """
-#         Aktualizuje istniejący obiekt
-#         """
-#         obj_id = request.data.get("id")
-#         ciphertext_b64 = request.data.get("ciphertext")
-
-#         if not obj_id or not ciphertext_b64:
-#             return Response({"error": "id and ciphertext required"}, status=400)
-
-#         try:
-#             obj = EncryptedObject.objects.get(
-#                 id=obj_id,
-#                 user=request.user,
-#                 object_type=object_type
-#             )
-#         except EncryptedObject.DoesNotExist:
-#             return Response({"error": "not found"}, status=404)
-
-#         obj.ciphertext = base64.b64decode(ciphertext_b64)
-#         obj.save()
-
-#         return Response({"status": "updated"}, status=200)
-
-#     def delete(self, request, object_type):
-#         """
-#         Usuwa obiekt
-#         """
-#         obj_id = request.data.get("id")
-
-#         try:
-#             obj = EncryptedObject.objects.get(
-#                 id=obj_id,
-#                 user=request.user,
-#                 object_type=object_type
-#             )
-#         except EncryptedObject.DoesNotExist:
-#             return Response({"error": "not found"}, status=404)
-
-#         obj.delete()
-#         return Response({"status": "deleted"}, status=200)
+class KeyBundleView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - pakiet kluczy do odblokowania danych
+    # =========================
+    def get(self, request):
+        """
+        kdf_salt, kdf_iterations, public_key, encrypted_private_key, iv i crypto_version.
+        Z Redisa, z silnym ETagiem - powtórne odblokowanie to 304 bez Postgresa.
+        """
+        cached = get_key_bundle(request.user.id)
+        if cached is None:
+            return Response({"error": "Profile not found"}, status=404)
+
+        bundle, etag = cached
+        response = Response(status=304) if etag_matches(request, etag) else Response(bundle)
+
+        response["ETag"] = etag
+        if bundle["public_key"] is None or bundle["encrypted_private_key"] is None:
+            # Rejestracja odroczona jeszcze trwa - pustych kluczy nie wolno trzymać 24 h
+            patch_cache_control(response, no_store=True)
+        else:
+            patch_cache_control(response, private=True, max_age=BUNDLE_MAX_AGE)
+        patch_vary_headers(response, ["Authorization"])
+        return response
+
+    # =========================
+    # PUT - ponowne opakowanie klucza prywatnego (re-keying)
+    # =========================
+    def put(self, request):
+        """
+        PBKDF2 z nowymi parametrami liczy klient - serwer nie zna hasła,
+        więc nie może przepakować klucza sam, a login nie płaci za migrację.
+        Klient wysyła nowy IV razem z nowym ciphertextem.
+        Wymaga If-Match z ETagiem pakietu, który klient odpakował.
+        """
+        cached = get_key_bundle(request.user.id)
+        if cached is None:
+            return Response({"error": "Profile not found"}, status=404)
+
+        bundle, etag = cached
+        if bundle["encrypted_private_key"] is None:
+            return Response({"error": "Keys are not provisioned yet"}, status=409)
+
+        if_match = request.headers.get("If-Match")
+        if not if_match:
+            return Response({"error": "If-Match required"}, status=428)
+        if if_match.strip() != etag:
+            return Response({"error": "Key bundle was modified"}, status=412)
+
+        serializer = KeyBundleSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        if not replace_key_bundle(request.user.id, bundle, serializer.validated_data):
+            return Response({"error": "Key bundle was modified"}, status=412)
+
+        bundle, etag = get_key_bundle(request.user.id)
+        return Response(bundle, headers={"ETag": etag})
+
+class PublicKeysView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - klucze publiczne do udostępniania (?ids=1,2,3)
+    # =========================
+    def get(self, request):
+        try:
+            user_ids = list(dict.fromkeys(
+                int(user_id) for user_id in request.query_params.get("ids", "").split(",") if user_id
+            ))
+        except ValueError:
+            return Response({"error": "ids must be a comma-separated list of integers"}, status=400)
+
+        if not user_ids or len(user_ids) > MAX_PUBLIC_KEYS:
+            return Response({"error": f"Pass between 1 and {MAX_PUBLIC_KEYS} ids"}, status=400)
+
+        keys, etag = get_public_keys(user_ids)
+        response = Response(status=304) if etag_matches(request, etag) else Response(keys)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, max_age=PUBLIC_KEYS_MAX_AGE)
+        return response
+
+class EncryptedObjectView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - obiekty zmienione od kursora (binarnie)
+    # =========================
+    def get(self, request, object_type):
+        """
+        Body to ciąg ramek: id (int64), updated_at w µs (int64), długość (uint32)
+        i surowy ciphertext - bez base64. Klient zapisuje X-Sync-Cursor
+        i podaje go jako ?since=; przy X-Has-More: 1 pyta od razu dalej.
+        """
+        try:
+            limit = parse_limit(request.query_params.get("limit"), maximum=MAX_OBJECT_BATCH_SIZE)
+            rows, since, has_more = objects_since(
+                request.user.id, object_type, request.query_params.get("since"), limit
+            )
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor"}, status=400)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, iter_frames(rows)), content_type=ENCRYPTED_CONTENT_TYPE
+        )
+        if since:
+            response["X-Sync-Cursor"] = since
+        response["X-Has-More"] = "1" if has_more else "0"
+        return response
+
+    # =========================
+    # POST - hurtowy zapis (binarnie)
+    # =========================
+    def post(self, request, object_type):
+        """
+        Body to ciąg ramek: id (int64, 0 = nowy obiekt), długość (uint32)
+        i surowy ciphertext. Wszystko w jednej transakcji.
+        """
+        if not request.content_type.startswith(ENCRYPTED_CONTENT_TYPE):
+            return Response({"error": f"Content-Type must be {ENCRYPTED_CONTENT_TYPE}"}, status=415)
+
+        stream = request.stream
+        if stream is None:
+            return Response({"error": "Empty body"}, status=400)
+
+        try:
+            frames = read_frames(stream)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        result = save_objects(request.user.id, object_type, frames)
+        return Response(result, status=status.HTTP_201_CREATED if result["created"] else 200)
+
+    # =========================
+    # DELETE - usuwanie ({"ids": [...]})
+    # =========================
+    def delete(self, request, object_type):
+        ids = request.data.get("ids") if isinstance(request.data, dict) else None
+
+        # Tylko lista liczb z JSON-a - "123" nie może stać się [1, 2, 3], a true id 1
+        if not isinstance(ids, list) or not all(
+            isinstance(pk, int) and not isinstance(pk, bool) for pk in ids
+        ):
+            return Response({"error": "ids must be a list of integers"}, status=400)
+
+        if len(ids) > MAX_OBJECT_BATCH_SIZE:
+            return Response({"error": f"At most {MAX_OBJECT_BATCH_SIZE} ids per request"}, status=400)
+
+        deleted, _ = EncryptedObject.objects.filter(
+            user_id=request.user.id, object_type=object_type, id__in=ids
+        ).delete()
+        return Response({"deleted": deleted})
 
 class TaskView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated]
 
     # =========================
     # GET - lista + filtrowanie
     # =========================
     def get(self, request):
-        tasks = Task.objects.filter(user=request.user)
-
-        # --- filtrowanie po statusie ---
-        status_param = request.query_params.get("status")
-        if status_param:
-            tasks = tasks.filter(status=status_param)
-
-        # --- filtrowanie po ważnych ---
-        important_param = request.query_params.get("important")
-        if important_param == "true":
-            tasks = tasks.filter(is_important=True)
-
-        # --- wyszukiwanie ---
-        search_param = request.query_params.get("search")
-        if search_param:
-            tasks = tasks.filter(
-                Q(title__icontains=search_param) |
-                Q(description__icontains=search_param)
-            )
+        # Wersja listy z Redisa wystarcza do ETagu - 304 bez zapytań do bazy
+        params = request.query_params
+        version = get_task_list_version(request.user.id)
+        etag = task_list_etag(request.user.id, version, params)
+
+        if etag_matches(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            cache_key = task_list_cache_key(request.user.id, version, params)
+            cached = cache.get(cache_key)
+
+            if cached is None:
+                response = self.list_tasks(request)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+
+                headers = {
+                    name: response[name]
+                    for name in ("X-Next-Cursor", "Link")
+                    if response.has_header(name)
+                }
+                cache.set(cache_key, (response.data, headers), TASK_LIST_TIMEOUT)
+            else:
+                data, headers = cached
+                response = Response(data, headers=headers)
+
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def list_tasks(self, request):
+        try:
+            tasks, fields, limit = task_list_queryset(request.user.id, request.query_params)
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
 
-        tasks = tasks.order_by("-created_at")
+        # Tylko do odczytu: .values() + renderer orjson, bez obiektów modelu
+        rows, columns = task_list_values(tasks, fields)
+        page, next_cursor = split_page(list(rows), limit)
 
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        return Response(
+            project_rows(page, columns),
+            headers=next_page_headers(request, next_cursor)
+        )
 
     # =========================
     # POST - dodanie
@@ -285,8 +436,14 @@ class TaskView(APIView):
         serializer = TaskSerializer(data=request.data)
 
         if serializer.is_valid():
-            serializer.save(user=request.user)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            task = serializer.save(user_id=request.user.id)
+            bump_task_list_version(request.user.id)
+            publish_task_event(request.user.id, "created", task=serializer.data)
+            return Response(
+                serializer.data,
+                status=status.HTTP_201_CREATED,
+                headers={"ETag": task_etag(task)},
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -300,17 +457,29 @@ class TaskView(APIView):
             return Response({"error": "Task id required"}, status=400)
 
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
-        except Task.DoesNotExist:
-            return Response({"error": "Task not found"}, status=404)
+            task_id = int(task_id)
+            expected_version = parse_if_match(request, task_id)
+        except ValueError:
+            return Response({"error": "Invalid task id or If-Match"}, status=400)
 
-        serializer = TaskSerializer(task, data=request.data, partial=True)
+        serializer = TaskSerializer(data=request.data, partial=True)
 
-        if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
 
-        return Response(serializer.errors, status=400)
+        # Jedno UPDATE ... RETURNING zamiast SELECT + pełnego save()
+        task = update_task(task_id, request.user.id, serializer.validated_data, expected_version)
+
+        if task is None:
+            if precondition_failed(task_id, request.user.id, expected_version):
+                return Response({"error": "Task was modified"}, status=412)
+            return Response({"error": "Task not found"}, status=404)
+
+        bump_task_list_version(request.user.id)
+
+        data = TaskSerializer(task).data
+        publish_task_event(request.user.id, "updated", task=data)
+        return Response(data, headers={"ETag": task_etag(task)})
 
     # =========================
     # DELETE - usuwanie
@@ -322,21 +491,307 @@ class TaskView(APIView):
             return Response({"error": "Task id required"}, status=400)
 
         try:
-            task = Task.objects.get(id=task_id, user=request.user)
-        except Task.DoesNotExist:
+            task_id = int(task_id)
+            expected_version = parse_if_match(request, task_id)
+        except ValueError:
+            return Response({"error": "Invalid task id or If-Match"}, status=400)
+
+        # Jedno DELETE ... WHERE, 404 z liczby usuniętych wierszy
+        if not delete_task(task_id, request.user.id, expected_version):
+            if precondition_failed(task_id, request.user.id, expected_version):
+                return Response({"error": "Task was modified"}, status=412)
             return Response({"error": "Task not found"}, status=404)
 
-        task.delete()
+        bump_task_list_version(request.user.id)
+        publish_task_event(request.user.id, "deleted", id=task_id)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class FetchAllUsers(APIView):
+class TaskSyncView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - zmiany od kursora
+    # =========================
+    def get(self, request):
+        """
+        Zwraca taski zmienione i id usuniętych od ?since=<cursor>.
+        Klient zapisuje "cursor" z odpowiedzi i przy has_more pyta od razu dalej.
+        Zmiany z ostatniej minuty (SYNC_LAG) mogą przyjść ponownie - klient
+        nakłada je idempotentnie po id.
+        410 oznacza kursor starszy niż retencja tombstonów - trzeba pobrać listę od nowa.
+        """
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            changed, deleted, cursor, has_more = changes_since(
+                request.user.id, request.query_params.get("since"), limit
+            )
+        except CursorExpired:
+            return Response({"error": "Cursor expired, full resync required"}, status=410)
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor"}, status=400)
+
+        return Response({
+            "changed": TaskSerializer(changed, many=True).data,
+            "deleted": deleted,
+            "cursor": cursor,
+            "has_more": has_more,
+        })
+
+class TaskStatsView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - liczniki dla dashboardu
+    # =========================
     def get(self, request):
-        # Pobieramy wszystkich userów z db -> typ: QuerySet
-        users = User.objects.all()
+        # Cache pod wersją listy tasków - każdy zapis unieważnia go w O(1)
+        version = get_task_list_version(request.user.id)
+        cache_key = task_stats_cache_key(request.user.id, version)
+
+        stats = cache.get(cache_key)
+        if stats is None:
+            stats = task_stats(request.user.id)
+            cache.set(cache_key, stats, TASK_LIST_TIMEOUT)
+
+        return Response(stats)
+
+class TaskExportView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # GET - eksport wszystkich tasków (?type=ndjson|csv)
+    # =========================
+    def get(self, request):
+        # "type", bo "format" zajmuje negocjacja rendererów DRF
+        export_type = request.query_params.get("type", "ndjson")
+
+        if export_type not in EXPORTERS:
+            return Response({"error": "type must be ndjson or csv"}, status=400)
+
+        response = StreamingHttpResponse(
+            streaming_content(request, EXPORTERS[export_type](export_rows(request.user.id))),
+            content_type=CONTENT_TYPES[export_type],
+        )
+        response["Content-Disposition"] = f'attachment; filename="tasks.{export_type}"'
+        return response
+
+class TaskImportView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    # =========================
+    # POST - import z NDJSON / CSV (?type=ndjson|csv)
+    # =========================
+    def post(self, request):
+        """
+        Body to surowy plik NDJSON albo CSV (nagłówek z nazwami pól).
+        Czytany linia po linii, zapisywany paczkami - bez ładowania całości do pamięci.
+        """
+        import_type = request.query_params.get("type", "ndjson")
+
+        if import_type not in PARSERS:
+            return Response({"error": "type must be ndjson or csv"}, status=400)
 
-        # Zamieniamy QuerySet na format JSON (Za pomocą serializacji)
-        users_serialized = UserSerializer(users, many=True)
+        stream = request.stream
+        if stream is None:
+            return Response({"error": "Empty body"}, status=400)
 
-        # Zwracamy odpowiedź
-        return Response(users_serialized.data)
+        lines = (line.decode("utf-8-sig") for line in iter(stream.readline, b""))
+        created = [0]
 
+        def progress(report):
+            created[0] = report["created"]
+
+        try:
+            report = import_tasks(request.user.id, PARSERS[import_type](lines), on_progress=progress)
+        finally:
+            # Paczki są zatwierdzane osobno - także przerwany import zmienił listę
+            if created[0]:
+                bump_task_list_version(request.user.id)
+                publish_task_event(request.user.id, "imported", created=created[0])
+
+        if "aborted" in report:
+            return Response(report, status=400)
+        return Response(report, status=status.HTTP_201_CREATED if report["created"] else 200)
+
+class TaskBatchView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    MAX_BATCH_SIZE = 1000
+
+    # =========================
+    # POST - hurtowe create / update / delete
+    # =========================
+    def post(self, request):
+        """
+        Body: {"create": [task, ...], "update": [{"id": 1, ...}, ...], "delete": [id, ...]}
+
+        Wszystko albo nic: błąd walidacji dowolnego elementu zwraca 400
+        z błędami per element. Zapis to bulk_create, jeden SELECT ... FOR UPDATE,
+        bulk_update i jeden DELETE w jednej transakcji.
+        """
+        if not isinstance(request.data, dict):
+            return Response({"error": "Expected a JSON object"}, status=400)
+
+        creates = request.data.get("create", [])
+        updates = request.data.get("update", [])
+        deletes = request.data.get("delete", [])
+
+        if not all(isinstance(items, list) for items in (creates, updates, deletes)):
+            return Response({"error": "create, update and delete must be lists"}, status=400)
+
+        if max(len(creates), len(updates), len(deletes)) > self.MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"At most {self.MAX_BATCH_SIZE} items per operation"},
+                status=400
+            )
+
+        # --- walidacja ---
+        create_serializer = TaskSerializer(data=creates, many=True)
+        update_serializer = TaskSerializer(data=updates, many=True, partial=True)
+        errors = {}
+
+        if not create_serializer.is_valid():
+            errors["create"] = create_serializer.errors
+        if not update_serializer.is_valid():
+            errors["update"] = update_serializer.errors
+
+        try:
+            update_ids = [int(item["id"]) for item in updates]
+            delete_ids = [int(task_id) for task_id in deletes]
+        except (KeyError, TypeError, ValueError):
+            errors["ids"] = "Every update needs an integer id and delete must list integer ids"
+        else:
+            # Powtórzone id w delete dałoby zdublowane tombstone'y i zawyżone "deleted"
+            all_ids = update_ids + delete_ids
+            if len(set(all_ids)) != len(all_ids):
+                errors["ids"] = "Each id may appear only once across update and delete"
+
+        if errors:
+            return Response(errors, status=400)
+
+        # --- zapis ---
+        user_id = request.user.id
+        with transaction.atomic():
+            created = Task.objects.bulk_create(
+                [Task(user_id=user_id, **data) for data in create_serializer.validated_data]
+            )
+
+            existing = Task.objects.select_for_update().filter(
+                user_id=user_id, id__in=update_ids + delete_ids
+            ).in_bulk()
+
+            now = datetime.now(timezone.utc)
+            updated = []
+            changed_fields = set()
+            for task_id, data in zip(update_ids, update_serializer.validated_data):
+                task = existing.get(task_id)
+                if task is None:
+                    continue
+                for field, value in data.items():
+                    setattr(task, field, value)
+                if data:
+                    # bulk_update omija auto_now
+                    task.version += 1
+                    task.updated_at = now
+                changed_fields.update(data)
+                updated.append(task)
+
+            if updated and changed_fields:
+                Task.objects.bulk_update(
+                    updated, sorted(changed_fields | {"version", "updated_at"})
+                )
+
+            deleted_ids = [task_id for task_id in delete_ids if task_id in existing]
+            if deleted_ids:
+                Task.objects.filter(user_id=user_id, id__in=deleted_ids).delete()
+                TaskTombstone.objects.bulk_create(
+                    [TaskTombstone(user_id=user_id, task_id=task_id) for task_id in deleted_ids]
+                )
+
+        created_data = TaskSerializer(created, many=True).data
+        if created or updated or deleted_ids:
+            bump_task_list_version(user_id)
+            publish_task_event(
+                user_id,
+                "batch",
+                created=created_data,
+                updated=TaskSerializer(updated, many=True).data,
+                deleted=deleted_ids,
+            )
+
+        return Response({
+            "create": created_data,
+            "update": [
+                {"id": task_id, "status": "updated", "task": TaskSerializer(existing[task_id]).data}
+                if task_id in existing else {"id": task_id, "status": "not_found"}
+                for task_id in update_ids
+            ],
+            "delete": [
+                {"id": task_id, "status": "deleted" if task_id in existing else "not_found"}
+                for task_id in delete_ids
+            ],
+        })
+
+class UserDirectoryView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+
+    DIRECTORY_TIMEOUT = 30
+
+    def get(self, request):
+        """
+        Katalog userów do udostępniania / przypisywania: tylko id, username
+        i email, stronicowany po username (?cursor=, ?limit=) i z wyszukiwaniem
+        po prefiksie (?search=). Strony krótko trzymane w cache.
+        """
+        search = request.query_params.get("search", "").strip()
+        cursor = request.query_params.get("cursor")
+
+        try:
+            limit = parse_limit(request.query_params.get("limit"))
+            after = decode_username_cursor(cursor) if cursor else None
+        except ValueError:
+            return Response({"error": "Invalid limit or cursor"}, status=400)
+
+        cache_key = "users:directory:" + encode_username_cursor(f"{search}|{after}|{limit}")
+        cached = cache.get(cache_key)
+
+        if cached is None:
+            # Pobieramy tylko potrzebne kolumny, po indeksie na username
+            users = User.objects.order_by("username")
+            if search:
+                users = users.filter(username__istartswith=search)
+            if after is not None:
+                users = users.filter(username__gt=after)
+
+            rows = list(users.values("id", "username", "email")[:limit + 1])
+            page = rows[:limit]
+            next_cursor = encode_username_cursor(page[-1]["username"]) if len(rows) > limit else None
+
+            cached = (page, next_page_headers(request, next_cursor))
+            cache.set(cache_key, cached, self.DIRECTORY_TIMEOUT)
+
+        page, headers = cached
+        return Response(page, headers=headers)
+
+class MetricsView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    # =========================
+    # GET - liczniki w formacie Prometheusa
+    # =========================
+    def get(self, request):
+        # Scraper podaje "Authorization: Bearer <token>"; bez tokenu tylko z METRICS_PUBLIC=1
+        if settings.METRICS_TOKEN:
+            authorization = request.headers.get("Authorization", "")
+            if not constant_time_compare(authorization, f"Bearer {settings.METRICS_TOKEN}"):
+                return Response({"error": "Forbidden"}, status=403)
+        elif not settings.METRICS_PUBLIC:
+            return Response({"error": "Forbidden"}, status=403)
+
+        return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -286,6 +286,30 @@ const smartFetch = async (url: string, options: any = {}, retryCount = 0) => {
   return response;
 };
 
+// POBIERANIE WSZYSTKICH STRON
+// Listy z API są stronicowane (max 500 na stronę) - idziemy po kursorze
+// z nagłówka X-Next-Cursor, aż serwer go nie zwróci
+const PAGE_SIZE = 500;
+
+const fetchAllPages = async <T,>(url: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const pageUrl = new URL(url, window.location.origin);
+    pageUrl.searchParams.set("limit", String(PAGE_SIZE));
+    if (cursor) pageUrl.searchParams.set("cursor", cursor);
+
+    const res = await smartFetch(pageUrl.toString());
+    if (!res.ok) throw new Error("Błąd pobierania danych z serwera");
+
+    items.push(...(await res.json()));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+
+  return items;
+};
+
 // ── Component ──────────────────────────────────────────
 
 export default function Dashboard() {
@@ -417,10 +441,7 @@ export default function Dashboard() {
     const finalUrl = params.toString() ? `${url}?${params.toString()}` : url;
 
     try {
-      const res = await smartFetch(finalUrl);
-      if (!res.ok) throw new Error("Błąd pobierania danych z serwera");
-      
-      const data = await res.json();
+      const data = await fetchAllPages<Task>(finalUrl);
       setTasks(data);
       
     } catch (err: any) {
@@ -439,10 +460,7 @@ export default function Dashboard() {
   // =========================
   const fetchAllUsers = async () => {
     try {
-      const res = await smartFetch(`${API_URL}/api/api/allusers/`);
-      if (!res.ok) throw new Error("Błąd pobierania użytkowników");
-      
-      const data = await res.json();
+      const data = await fetchAllPages<SharedUser>(`${API_URL}/api/api/allusers/`);
       setSharedUsers(data); // Tu dane z Postgresa wpadają do frontendu
     } catch (err: any) {
       console.error("Błąd fetchAllUsers:", err);